@@ -71,13 +71,13 @@ QUICK_ERROR_BUTTONS = {
     "10": "🔟 Свой вариант",
 }
 
-# Фиксированный список менеджеров Павлограда
-PAVLOGRAD_MANAGERS = [
+# Фиксированный список менеджеров Павлограда (неизменяемый)
+PAVLOGRAD_MANAGERS = (
     "Аладин", "Ваня", "Вова", "Ганжа", "Диана", "Дима", "Добряк",
     "Дрон", "Егор", "Женя", "Лера", "Леся", "Лысый", "Миша",
     "Cергей", "Тёма", "Вита", "Анжела", "Данил", "Брателло",
     "Кирилл", "Дядя", "Ржавый", "Родион",
-]
+)
 
 # Маппинг для нормализации имён менеджеров
 NAME_MAP = {
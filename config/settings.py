@@ -127,6 +127,9 @@ class Settings:
             # Иначе используем старый ADMIN_ID
             self.ADMINS = [self.ADMIN_ID]
 
+        # Множество для O(1) проверки прав (список сохраняет порядок рассылок)
+        self.ADMINS_SET = frozenset(self.ADMINS)
+
     def _parse_pult(self):
         """Парсинг списка пульта из .env"""
         pult_str = os.getenv("PULT_IDS", "")
@@ -138,6 +141,8 @@ class Settings:
         else:
             self.PULT = []
 
+        self.PULT_SET = frozenset(self.PULT)
+
     def _parse_legacy_managers(self):
         """
         Парсинг СТАРЫХ менеджеров для миграции
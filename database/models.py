@@ -10,23 +10,73 @@
 ✅ get_quick_error_telephonies() - получить список
 """
 import sqlite3
+import threading
+import time
 from datetime import date, timedelta
-from typing import List, Dict, Optional
-from contextlib import closing
+from typing import Iterator, List, Dict, Optional, Tuple
+from contextlib import closing, contextmanager
 from utils.logger import logger
 
+SQL_IN_CHUNK_SIZE = 500  # Параметров в одном IN (...) — с запасом до лимита SQLite
+
+QUICK_ERROR_CACHE_SECONDS = 60  # Сколько живёт кэш кодов быстрых ошибок
+
+# Настройки долгоживущих соединений (WAL + увеличенный кэш страниц ~20 МБ)
+POOLED_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-20000",
+)
+
 
 class Database:
     """Класс для работы с SQLite базой данных"""
 
     def __init__(self, db_path: str = "bot_data.db"):
         self.db_path = db_path
+        # Версии списков: растут при каждом изменении (для кэшей отображения)
+        self.managers_version = 0
+        self.telephonies_version = 0
+        # Долгоживущее соединение на поток (sqlite3 не делит их между потоками)
+        self._local = threading.local()
+        # Кэш кодов быстрых ошибок: (время monotonic, коды)
+        self._quick_error_cache: Optional[Tuple[float, frozenset]] = None
         self._create_tables()
 
     def _get_connection(self):
         """Создаёт подключение к БД"""
         return sqlite3.connect(self.db_path)
 
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Переиспользуемое соединение текущего потока (строки - sqlite3.Row)
+
+        Соединение не закрывается после запроса, поэтому кэш страниц
+        SQLite сохраняется между вызовами. Транзакция фиксируется при
+        выходе из блока и откатывается при исключении.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            # Строки доступны и по индексу, и по имени колонки
+            conn.row_factory = sqlite3.Row
+            for pragma in POOLED_CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+        with conn:
+            yield conn
+
+    def data_version(self) -> int:
+        """
+        PRAGMA data_version долгоживущего соединения
+
+        Меняется, когда БД изменяют другие соединения, в том числе
+        другие процессы (например, update_managers_info.py).
+        """
+        with self.connection() as conn:
+            return conn.execute("PRAGMA data_version").fetchone()[0]
+
     def _create_tables(self):
         """Создаёт все необходимые таблицы"""
         conn = self._get_connection()
@@ -163,6 +213,7 @@ class Database:
                     (user_id, username, first_name, added_by),
                 )
                 conn.commit()
+            self.managers_version += 1
             logger.info(f"✅ Менеджер {user_id} добавлен в БД")
             return True
         except sqlite3.IntegrityError:
@@ -172,6 +223,33 @@ class Database:
             logger.error(f"❌ Ошибка добавления менеджера: {e}")
             return False
 
+    def add_managers_bulk(self, user_ids: List[int], added_by: int = None) -> int:
+        """
+        Добавляет нескольких менеджеров одной транзакцией
+
+        Уже существующие user_id пропускаются (INSERT OR IGNORE).
+
+        Returns:
+            Количество добавленных менеджеров (-1 при ошибке)
+        """
+        if not user_ids:
+            return 0
+
+        try:
+            with closing(self._get_connection()) as conn:
+                with conn:
+                    cursor = conn.executemany(
+                        "INSERT OR IGNORE INTO managers (user_id, added_by) VALUES (?, ?)",
+                        [(user_id, added_by) for user_id in user_ids],
+                    )
+                    added = cursor.rowcount
+            self.managers_version += 1
+            logger.info(f"✅ Добавлено менеджеров в БД: {added}")
+            return added
+        except Exception as e:
+            logger.error(f"❌ Ошибка пакетного добавления менеджеров: {e}")
+            return -1
+
     def remove_manager(self, user_id: int) -> bool:
         """Удаляет менеджера"""
         try:
@@ -181,6 +259,7 @@ class Database:
                 deleted = cursor.rowcount > 0
                 conn.commit()
             if deleted:
+                self.managers_version += 1
                 logger.info(f"✅ Менеджер {user_id} удалён")
             return deleted
         except Exception as e:
@@ -210,6 +289,17 @@ class Database:
             logger.error(f"❌ Ошибка получения менеджеров: {e}")
             return []
 
+    def get_manager_rows(self) -> List[Tuple[int, str, str]]:
+        """Менеджеры как кортежи (user_id, username, first_name) — для вывода списков"""
+        try:
+            with closing(self._get_connection()) as conn:
+                return conn.execute(
+                    "SELECT user_id, username, first_name FROM managers ORDER BY added_at DESC"
+                ).fetchall()
+        except Exception as e:
+            logger.error(f"❌ Ошибка получения менеджеров: {e}")
+            return []
+
     def is_manager(self, user_id: int) -> bool:
         """Проверяет, является ли пользователь менеджером"""
         try:
@@ -222,6 +312,29 @@ class Database:
             logger.error(f"❌ Ошибка проверки менеджера: {e}")
             return False
 
+    def get_existing_manager_ids(self, user_ids: List[int]) -> set:
+        """Возвращает те user_id из списка, которые уже являются менеджерами"""
+        if not user_ids:
+            return set()
+
+        try:
+            existing = set()
+            with closing(self._get_connection()) as conn:
+                # Частями: у SQLite ограничено число параметров в запросе
+                for start in range(0, len(user_ids), SQL_IN_CHUNK_SIZE):
+                    end = start + SQL_IN_CHUNK_SIZE
+                    chunk = user_ids[start:end]
+                    placeholders = ", ".join("?" * len(chunk))
+                    cursor = conn.execute(
+                        f"SELECT user_id FROM managers WHERE user_id IN ({placeholders})",
+                        chunk,
+                    )
+                    existing.update(row[0] for row in cursor)
+            return existing
+        except Exception as e:
+            logger.error(f"❌ Ошибка проверки менеджеров: {e}")
+            return set()
+
     def update_manager_info(
         self, user_id: int, username: str = None, first_name: str = None
     ) -> bool:
@@ -236,6 +349,7 @@ class Database:
                 updated = cursor.rowcount > 0
                 conn.commit()
             if updated:
+                self.managers_version += 1
                 logger.info(
                     f"✅ Обновлены данные менеджера {user_id}: {username}, {first_name}"
                 )
@@ -258,6 +372,7 @@ class Database:
                     (name, code.lower(), tel_type, group_id, created_by),
                 )
                 conn.commit()
+            self.telephonies_version += 1
             logger.info(f"✅ Телефония {name} ({tel_type}) добавлена")
             return True
         except sqlite3.IntegrityError:
@@ -276,6 +391,7 @@ class Database:
                 deleted = cursor.rowcount > 0
                 conn.commit()
             if deleted:
+                self.telephonies_version += 1
                 logger.info(f"✅ Телефония {code} удалена")
             return deleted
         except Exception as e:
@@ -306,6 +422,17 @@ class Database:
             logger.error(f"❌ Ошибка получения телефоний: {e}")
             return []
 
+    def get_telephony_rows(self) -> List[Tuple[str, str, str, int]]:
+        """Включённые телефонии как кортежи (name, code, type, group_id) — для вывода списков"""
+        try:
+            with closing(self._get_connection()) as conn:
+                return conn.execute(
+                    "SELECT name, code, type, group_id FROM telephonies WHERE enabled = 1 ORDER BY name"
+                ).fetchall()
+        except Exception as e:
+            logger.error(f"❌ Ошибка получения телефоний: {e}")
+            return []
+
     def get_telephony_by_code(self, code: str) -> Optional[Dict]:
         """Получает телефонию по коду"""
         try:
@@ -342,6 +469,7 @@ class Database:
                 updated = cursor.rowcount > 0
                 conn.commit()
             if updated:
+                self.telephonies_version += 1
                 logger.info(f"✅ Группа телефонии {code} обновлена")
             return updated
         except Exception as e:
@@ -649,13 +777,12 @@ class Database:
                 return False
 
             # Добавляем в быстрые
-            with closing(self._get_connection()) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
+            with self.connection() as conn:
+                conn.execute(
                     "INSERT INTO quick_error_telephonies (telephony_code) VALUES (?)",
                     (code,),
                 )
-                conn.commit()
+            self.invalidate_quick_error_cache()
 
             logger.info(f"✅ Телефония {code} добавлена в быстрые ошибки")
             return True
@@ -667,6 +794,47 @@ class Database:
             logger.error(f"❌ Ошибка добавления в быстрые ошибки: {e}")
             return False
 
+    def add_quick_error_telephonies_bulk(self, codes: List[str]) -> int:
+        """
+        Добавить несколько телефоний в быстрые ошибки одной транзакцией
+
+        Коды должны быть уже проверены; уже добавленные пропускаются
+        (INSERT OR IGNORE).
+
+        Returns:
+            Количество добавленных телефоний (-1 при ошибке)
+        """
+        if not codes:
+            return 0
+
+        try:
+            with self.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                cursor = conn.executemany(
+                    "INSERT OR IGNORE INTO quick_error_telephonies (telephony_code) VALUES (?)",
+                    [(code,) for code in codes],
+                )
+                added = cursor.rowcount
+            self.invalidate_quick_error_cache()
+
+            logger.info(f"✅ Добавлено телефоний в быстрые ошибки: {added}")
+            return added
+
+        except Exception as e:
+            logger.error(f"❌ Ошибка пакетного добавления в быстрые ошибки: {e}")
+            return -1
+
+    def get_telephony_types(self) -> Dict[str, str]:
+        """Типы всех телефоний {code: type} - для пакетных проверок"""
+        try:
+            with self.connection() as conn:
+                return dict(
+                    conn.execute("SELECT code, type FROM telephonies").fetchall()
+                )
+        except Exception as e:
+            logger.error(f"❌ Ошибка получения типов телефоний: {e}")
+            return {}
+
     def remove_quick_error_telephony(self, code: str) -> bool:
         """
         Удалить телефонию из быстрых ошибок
@@ -678,16 +846,15 @@ class Database:
             True если успешно
         """
         try:
-            with closing(self._get_connection()) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
+            with self.connection() as conn:
+                cursor = conn.execute(
                     "DELETE FROM quick_error_telephonies WHERE telephony_code = ?",
                     (code,),
                 )
                 deleted = cursor.rowcount > 0
-                conn.commit()
 
             if deleted:
+                self.invalidate_quick_error_cache()
                 logger.info(f"✅ Телефония {code} удалена из быстрых ошибок")
             else:
                 logger.warning(f"⚠️ Телефония {code} не была в быстрых ошибках")
@@ -702,26 +869,39 @@ class Database:
         """
         Проверить, является ли телефония быстрой
 
+        Проверка идёт по кэшу кодов в памяти (обновляется раз в
+        QUICK_ERROR_CACHE_SECONDS и сразу после изменений).
+
         Args:
             code: Код телефонии
 
         Returns:
             True если телефония в быстрых ошибках
         """
-        try:
-            with closing(self._get_connection()) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT 1 FROM quick_error_telephonies WHERE telephony_code = ?",
-                    (code,),
-                )
-                exists = cursor.fetchone() is not None
+        return code in self._get_quick_error_codes()
 
-            return exists
+    def _get_quick_error_codes(self) -> frozenset:
+        """Коды телефоний с быстрыми ошибками (с кэшем)"""
+        cached = self._quick_error_cache
+        if cached and time.monotonic() - cached[0] < QUICK_ERROR_CACHE_SECONDS:
+            return cached[1]
 
+        try:
+            with self.connection() as conn:
+                rows = conn.execute(
+                    "SELECT telephony_code FROM quick_error_telephonies"
+                ).fetchall()
         except Exception as e:
             logger.error(f"❌ Ошибка проверки быстрых ошибок: {e}")
-            return False
+            return frozenset()
+
+        codes = frozenset(row[0] for row in rows)
+        self._quick_error_cache = (time.monotonic(), codes)
+        return codes
+
+    def invalidate_quick_error_cache(self):
+        """Сбросить кэш кодов быстрых ошибок (после добавления/удаления)"""
+        self._quick_error_cache = None
 
     def get_quick_error_telephonies(self) -> List[Dict]:
         """
@@ -731,9 +911,8 @@ class Database:
             Список словарей с информацией о телефониях
         """
         try:
-            with closing(self._get_connection()) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
+            with self.connection() as conn:
+                cursor = conn.execute(
                     """
                     SELECT t.name, t.code, t.group_id, qe.added_at
                     FROM quick_error_telephonies qe
@@ -744,10 +923,7 @@ class Database:
                 )
                 rows = cursor.fetchall()
 
-            return [
-                {"name": row[0], "code": row[1], "group_id": row[2], "added_at": row[3]}
-                for row in rows
-            ]
+            return [dict(row) for row in rows]
 
         except Exception as e:
             logger.error(f"❌ Ошибка получения списка быстрых ошибок: {e}")
@@ -8,7 +8,6 @@ from services.user_service import user_service
 from database.models import db
 from keyboards.reply import get_manager_menu, get_admin_menu, get_pult_menu
 from utils.state import clear_all_states
-from utils.logger import logger
 
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -35,20 +34,8 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # ===== АВТООБНОВЛЕНИЕ ИНФОРМАЦИИ В БД =====
     # Если менеджер уже есть в БД, обновляем его username/first_name
     if db.is_manager(user_id):
-        try:
-            conn = db._get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                "UPDATE managers SET username = ?, first_name = ? WHERE user_id = ?",
-                (username, first_name, user_id),
-            )
-            conn.commit()
-            conn.close()
-            logger.info(
-                f"✅ Обновлены данные менеджера {user_id}: {username}, {first_name}"
-            )
-        except Exception as e:
-            logger.error(f"❌ Ошибка обновления данных менеджера: {e}")
+        # Через Database: метод сам логирует и сбрасывает кэш списка менеджеров
+        db.update_manager_info(user_id, username, first_name)
 
     # Автоматическое определение роли (приоритет: админ > пульт > менеджер)
     if user_service.is_admin(user_id):
@@ -156,6 +156,8 @@ def _check_google_sheets() -> dict:
                 "spreadsheet": title,
                 "worksheets_count": len(worksheets),
                 "sheet_id": google_sheets_service.sheet_id[:20] + "...",
+                "api_requests": google_sheets_service.api_requests,
+                "write_quota_used": google_sheets_service.write_quota_used,
             },
         }
 
@@ -377,6 +379,8 @@ def _format_health_message(health_status: dict) -> str:
         d = gs_info["details"]
         message += f"   Таблица: {d['spreadsheet']}\n"
         message += f"   Листов: {d['worksheets_count']}\n"
+        message += f"   Запросов к API: {d['api_requests']}\n"
+        message += f"   Квота записи использована: {d['write_quota_used']}\n"
     elif "error" in gs_info:
         message += f"   ⚠️ {gs_info['error']}\n"
     message += "\n"
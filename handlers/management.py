@@ -10,10 +10,13 @@ handlers/management.py - ЧИСТЫЙ UX
 ✅ ИСПРАВЛЕНО: Флаги для предотвращения алертов "Неизвестная команда"
 ✅ ДОБАВЛЕНО: Input Validation всех входных данных
 """
+import html
+
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, ConversationHandler
 
 from services.management_service import management_service
+from services.quick_error_service import QuickErrorService
 from keyboards.inline import get_management_menu, get_telephony_type_keyboard
 from utils.state import clear_all_states
 from utils.logger import logger
@@ -495,21 +498,9 @@ async def broadcast_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.message.edit_text("📤 Отправка рассылки...")
 
     try:
-        managers = db.get_all_managers()
-
-        stats = {"total": len(managers), "success": 0, "failed": 0}
-
-        for manager in managers:
-            try:
-                await context.bot.copy_message(
-                    chat_id=manager["user_id"],
-                    from_chat_id=chat_id,
-                    message_id=message_id,
-                )
-                stats["success"] += 1
-            except Exception as e:
-                stats["failed"] += 1
-                logger.error(f"❌ Рассылка user_id={manager['user_id']}: {e}")
+        stats = await management_service.broadcast_copy(
+            context.bot, chat_id, message_id, update.effective_user.id
+        )
 
     except Exception as e:
         logger.error(f"❌ Ошибка рассылки: {e}")
@@ -522,7 +513,7 @@ async def broadcast_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"📊 Статистика:\n"
         f"• Всего: {stats['total']}\n"
         f"• Успешно: {stats['success']}\n"
-        f"• Ошибок: {stats['failed']}"
+        f"• Ошибок: {stats['failed'] + stats['blocked']}"
     )
 
     keyboard = InlineKeyboardMarkup(
@@ -606,7 +597,8 @@ async def quick_errors_add_start(update: Update, context: ContextTypes.DEFAULT_T
 
     await query.message.edit_text(
         "➕ <b>Добавить в быстрые ошибки</b>\n\n"
-        "Отправьте <b>код</b> телефонии (например: <code>bmw</code>)\n\n"
+        "Отправьте <b>код</b> телефонии (например: <code>bmw</code>)\n"
+        "Можно несколько кодов через пробел или запятую\n\n"
         "⚠️ Требования:\n"
         "• Телефония должна существовать\n"
         "• Телефония должна быть белой (с кнопками)\n\n"
@@ -623,7 +615,31 @@ async def quick_errors_add_process(update: Update, context: ContextTypes.DEFAULT
     # ✅ УБРАТЬ ФЛАГ СРАЗУ
     context.user_data.pop("awaiting_qe_code_add", None)
 
-    code = update.message.text.strip().lower()
+    codes = update.message.text.replace(",", " ").lower().split()
+
+    keyboard = InlineKeyboardMarkup(
+        [
+            [
+                InlineKeyboardButton(
+                    "« К быстрым ошибкам", callback_data="mgmt_quick_errors"
+                )
+            ]
+        ]
+    )
+
+    # Несколько кодов — пакетное добавление одной транзакцией
+    if len(codes) > 1:
+        added, errors = QuickErrorService.bulk_add_quick_error_telephonies(codes)
+        text = f"✅ <b>Добавлено в быстрые ошибки:</b> {added} из {len(codes)}"
+        if errors:
+            text += "\n\n" + html.escape("\n".join(errors))
+
+        await update.message.reply_text(text, parse_mode="HTML", reply_markup=keyboard)
+
+        clear_all_states(context)
+        return ConversationHandler.END
+
+    code = codes[0] if codes else ""
 
     # Проверяем формат
     if not code.isalnum():
@@ -666,16 +682,6 @@ async def quick_errors_add_process(update: Update, context: ContextTypes.DEFAULT
                 f"📞 {tel['name']} (<code>{code}</code>)"
             )
 
-    keyboard = InlineKeyboardMarkup(
-        [
-            [
-                InlineKeyboardButton(
-                    "« К быстрым ошибкам", callback_data="mgmt_quick_errors"
-                )
-            ]
-        ]
-    )
-
     await update.message.reply_text(text, parse_mode="HTML", reply_markup=keyboard)
 
     clear_all_states(context)
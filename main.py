@@ -434,6 +434,13 @@ def register_handlers(app: Application):
         logger.info(f"   Group {group_num}: {len(handlers_in_group)} handler(s)")
 
 
+async def close_http_sessions(app: Application):
+    """Закрыть общие HTTP-сессии сервисов при остановке приложения"""
+    from services.managers_stats_service import managers_stats_service
+
+    await managers_stats_service.close()
+
+
 def main():
     """Главная функция запуска бота"""
     try:
@@ -454,7 +461,12 @@ def main():
         logger.info(f"📋 Менеджеров в БД: {len(managers)}")
         logger.info("✅ БД инициализирована")
 
-        app = Application.builder().token(settings.BOT_TOKEN).build()
+        app = (
+            Application.builder()
+            .token(settings.BOT_TOKEN)
+            .post_shutdown(close_http_sessions)
+            .build()
+        )
 
         register_handlers(app)
 
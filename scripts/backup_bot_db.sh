@@ -22,6 +22,11 @@ if [ ! -f "$DB_FILE" ]; then
     exit 1
 fi
 
+if ! command -v sqlite3 > /dev/null 2>&1; then
+    log "❌ ОШИБКА: Не найдена утилита sqlite3 (apt install sqlite3)"
+    exit 1
+fi
+
 if [ ! -d "$BACKUP_DIR" ]; then
     log "📁 Создаю директорию для бэкапов: $BACKUP_DIR"
     mkdir -p "$BACKUP_DIR"
@@ -33,8 +38,9 @@ BACKUP_FILE="$BACKUP_DIR/bot_data_$DATE.db"
 
 log "🔄 Начало бэкапа..."
 
-# Копируем БД
-cp "$DB_FILE" "$BACKUP_FILE"
+# Копируем БД через SQLite online backup: база работает в режиме WAL,
+# часть записей может лежать в bot_data.db-wal, и простой cp их теряет
+sqlite3 "$DB_FILE" ".backup '$BACKUP_FILE'"
 
 if [ $? -eq 0 ]; then
     # Получаем размер файла
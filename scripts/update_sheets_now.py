@@ -9,16 +9,17 @@ import os
 # Добавляем корневую директорию в PYTHONPATH
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from services.google_sheets_service import GoogleSheetsService
+from services.google_sheets_service import google_sheets_service
 from utils.logger import logger
 
 
 async def main():
+    service = None
     try:
         logger.info("🔄 Запуск ручного обновления статистики...")
 
-        # Создаём экземпляр сервиса
-        service = GoogleSheetsService()
+        # Общий экземпляр сервиса (авторизация выполняется один раз при импорте)
+        service = google_sheets_service
 
         if not service.client or not service.spreadsheet:
             logger.error("❌ Не удалось инициализировать Google Sheets сервис")
@@ -39,6 +40,9 @@ async def main():
         import traceback
 
         logger.error(traceback.format_exc())
+    finally:
+        if service is not None:
+            await service.close()
 
 
 if __name__ == "__main__":
@@ -9,33 +9,97 @@
 ✅ Правильное определение текущей недели (ПН-СБ)
 ✅ Перезапись данных если они изменились в рабочей таблице
 """
+import asyncio
+import hashlib
 import os
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+import time
+from collections import Counter
+from datetime import date as date_type, datetime, timedelta
+from functools import lru_cache
+from operator import itemgetter
+from typing import Callable, List, Dict, Optional, Tuple
 import pytz
 from dotenv import load_dotenv
-from oauth2client.service_account import ServiceAccountCredentials
+from google.auth.transport.requests import AuthorizedSession
+from google.oauth2.service_account import Credentials
+from requests.adapters import HTTPAdapter
 import gspread
 from gspread.exceptions import WorksheetNotFound, APIError
+from gspread.utils import a1_range_to_grid_range, a1_to_rowcol
+from google.auth.exceptions import RefreshError
 
 from utils.logger import logger
 from config.settings import settings
 from config.constants import PAVLOGRAD_MANAGERS, NAME_MAP
+from services.google_sheets_cache import sheets_cache
 from tenacity import (
     retry,
     stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
+    wait_exponential_jitter,
+    retry_if_exception,
     before_sleep_log,
 )
 import logging
 import aiohttp
+import orjson
+
+# ===== RETRY =====
+# Повторяем только временные ошибки Google: квота (429) и сбои сервера (5xx).
+# Остальные APIError (403, 404, неверный запрос) повторять бессмысленно.
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+RETRY_MAX_WAIT_SECONDS = 60  # Квота Sheets поминутная — ждём до минуты
+
+_backoff_wait = wait_exponential_jitter(
+    initial=1, max=RETRY_MAX_WAIT_SECONDS, jitter=0.5
+)
+
+
+def _api_error_status(error: APIError) -> Optional[int]:
+    """HTTP-статус ответа, вызвавшего APIError (None если неизвестен)"""
+    return getattr(getattr(error, "response", None), "status_code", None)
+
+
+def _is_stale_sheet_error(error: APIError) -> bool:
+    """400 из-за устаревшего sheetId: листа с таким id нет или диапазон вне сетки"""
+    if _api_error_status(error) != 400:
+        return False
+    detail = error.args[0] if error.args else None
+    message = detail.get("message", "") if isinstance(detail, dict) else str(detail)
+    # "No grid with id: ..." / "... exceeds grid limits ..."
+    return "grid" in message.lower()
+
+
+def _is_retryable(error: BaseException) -> bool:
+    """Стоит ли повторять запрос после этой ошибки"""
+    if isinstance(error, APIError):
+        return _api_error_status(error) in RETRYABLE_STATUS_CODES
+    return isinstance(error, (RefreshError, aiohttp.ClientError, TimeoutError))
+
+
+def _retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Задержка из заголовка Retry-After (только секунды)"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _wait_retry_after(retry_state) -> float:
+    """Экспоненциальная задержка с jitter, но не меньше Retry-After сервера"""
+    wait = _backoff_wait(retry_state)
+    retry_after = _retry_after_seconds(retry_state.outcome.exception())
+    if retry_after is not None:
+        wait = max(wait, min(retry_after, RETRY_MAX_WAIT_SECONDS))
+    return wait
+
 
 # Настройка retry
 API_RETRY_CONFIG = {
-    "stop": stop_after_attempt(3),
-    "wait": wait_exponential(min=2, max=10),
-    "retry": retry_if_exception_type((APIError, aiohttp.ClientError, TimeoutError)),
+    "stop": stop_after_attempt(5),
+    "wait": _wait_retry_after,
+    "retry": retry_if_exception(_is_retryable),
     "before_sleep": before_sleep_log(logger, logging.WARNING),
 }
 
@@ -43,6 +107,134 @@ load_dotenv()
 
 # ===== КОНСТАНТЫ =====
 WEEKLY_PLAN = 10  # Недельный план трубок
+STATS_CACHE_BUCKET_SECONDS = 60  # Окно, в котором повторные запросы делят одни данные
+WRITE_QUOTA_PER_MINUTE = 55  # Запас до лимита Google (60 запросов/мин на пользователя)
+GOOGLE_SCOPES = (
+    "https://spreadsheets.google.com/feeds",
+    "https://www.googleapis.com/auth/drive",
+)
+HTTP_POOL_CONNECTIONS = 4  # Хосты Google: sheets, oauth2
+HTTP_POOL_MAXSIZE = 10  # Соединений на хост (вызовы идут из to_thread)
+WORKSHEET_CACHE_KEY = "sheets_worksheet_ids"  # Кэш title → sheetId между перезапусками
+WORKSHEET_CACHE_HOURS = 24
+DAY_CACHE_TODAY_SECONDS = 60  # Данные за сегодня ещё меняются
+DAY_CACHE_PAST_SECONDS = 86400  # Прошедшие дни неизменны
+
+# Месяцы в родительном падеже (индекс = месяц - 1)
+MONTHS_RU = (
+    "Января",
+    "Февраля",
+    "Марта",
+    "Апреля",
+    "Мая",
+    "Июня",
+    "Июля",
+    "Августа",
+    "Сентября",
+    "Октября",
+    "Ноября",
+    "Декабря",
+)
+MONTHS_RU_UPPER = tuple(month.upper() for month in MONTHS_RU)
+
+# Дни недели на листе (воскресенье не учитывается)
+DAY_NAMES = ("ПН", "ВТ", "СР", "ЧТ", "ПТ", "СБ")
+_day_values = itemgetter(*DAY_NAMES)  # Значения ПН..СБ из словаря дней одним вызовом
+
+# Множество для O(1) проверки принадлежности менеджера
+_MANAGERS_SET = frozenset(PAVLOGRAD_MANAGERS)
+
+# NAME_MAP с ключами в casefold и таблица удаления невидимых символов
+_NAME_MAP_CF = {key.casefold(): value for key, value in NAME_MAP.items()}
+_INVISIBLE_CHARS = str.maketrans("", "", "\u200b\u200c\u200d\ufeff")
+
+# Ширина колонок A..Y в пикселях
+COLUMN_WIDTHS = (
+    # ВСЕ ТРУБКИ: №, Менеджер, ПН-СБ, ИТОГО, ПЛАН
+    40,
+    120,
+    45,
+    45,
+    45,
+    45,
+    45,
+    45,
+    60,
+    50,
+    # Пробел
+    20,
+    # ПЕРЕЗВОНЫ: №, Менеджер, ПН-СБ, ИТОГО, %
+    40,
+    120,
+    45,
+    45,
+    45,
+    45,
+    45,
+    45,
+    60,
+    50,
+    # Пробел
+    20,
+    # СТАТИСТИКА
+    120,
+    120,
+    120,
+)
+
+# Стили границ таблиц (общие объекты, не изменяются)
+OUTER_BORDER = {"style": "SOLID", "width": 2}
+INNER_BORDER = {"style": "SOLID", "width": 1}
+
+# Общие шаблоны формата (только сериализуются, не изменяются)
+BOLD_TEXT = {"bold": True}
+TOTAL_ROW_CELL = {
+    "userEnteredFormat": {
+        "backgroundColor": {"red": 0.9, "green": 0.9, "blue": 0.9},
+        "textFormat": BOLD_TEXT,
+    }
+}
+FORMAT_FIELDS = "userEnteredFormat(backgroundColor,textFormat)"
+
+# Цвета градиента итогов: зелёный (лучшие), жёлтый (средние), красный (отстающие)
+GRADIENT_HIGH = {"red": 0.7, "green": 0.9, "blue": 0.7}
+GRADIENT_MID = {"red": 1, "green": 1, "blue": 0.7}
+GRADIENT_LOW = {"red": 1, "green": 0.7, "blue": 0.7}
+
+# Колонки дней + ИТОГО, по которым считаются суммы в строке ИТОГО
+TUBES_SUM_COLS = ("C", "D", "E", "F", "G", "H", "I")
+RECALLS_SUM_COLS = ("N", "O", "P", "Q", "R", "S", "T")
+
+
+def _normalize_manager_name(raw_name: str) -> str:
+    """Каноническое имя менеджера (без невидимых символов, по NAME_MAP)"""
+    name = raw_name.translate(_INVISIBLE_CHARS).strip()
+    return _NAME_MAP_CF.get(name.casefold(), name)
+
+
+def _request_op_type(method: str, endpoint: str) -> str:
+    """Тип запроса к Sheets API по HTTP-методу и пути"""
+    if endpoint.endswith("values:batchUpdate"):
+        return "values:batchUpdate"
+    if endpoint.endswith("values:batchGet"):
+        return "values:batchGet"
+    if endpoint.endswith(":batchUpdate"):
+        return ":batchUpdate"
+    if "/values/" in endpoint:
+        return f"values:{method.lower()}"
+    return f"metadata:{method.lower()}"
+
+
+class CountingClient(gspread.Client):
+    """Клиент gspread, считающий запросы к API по типам"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.request_counter: Counter = Counter()
+
+    def request(self, method, endpoint, *args, **kwargs):
+        self.request_counter[_request_op_type(method, endpoint)] += 1
+        return super().request(method, endpoint, *args, **kwargs)
 
 
 class GoogleSheetsService:
@@ -58,6 +250,23 @@ class GoogleSheetsService:
         )
         self.timezone = pytz.timezone("Europe/Kiev")
 
+        # Кэш статистики недели: ((понедельник, минутный bucket), данные)
+        self._week_stats_cache: Optional[Tuple[Tuple, Tuple[Dict, Dict]]] = None
+
+        # Свойства известных листов (title → sheetId/index) без запроса метаданных
+        self._ws_cache: Dict[str, Dict] = {}
+        self._cached_ws = None  # Последний использованный лист (лист текущей недели)
+        self._day_cache: Dict[str, Tuple[float, bool, Optional[List[Dict]]]] = {}
+        self._session: Optional[AuthorizedSession] = None  # HTTP-сессия gspread
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._last_format_signature: Optional[str] = None
+        self._http_loop = None
+
+        # Учёт записей в API для упреждения 429 (минутное окно)
+        self._quota_bucket = 0
+        self._writes_this_minute = 0
+        self.write_quota_used = 0  # Всего зарезервировано записей (не запросов)
+
         if not self.sheet_id:
             logger.error("❌ GOOGLE_SHEETS_ID не найден в .env файле!")
             return
@@ -75,17 +284,23 @@ class GoogleSheetsService:
                 logger.error(f"❌ Файл {self.credentials_file} не найден!")
                 return False
 
-            scope = [
-                "https://spreadsheets.google.com/feeds",
-                "https://www.googleapis.com/auth/drive",
-            ]
+            creds = Credentials.from_service_account_file(
+                self.credentials_file, scopes=GOOGLE_SCOPES
+            )
 
-            creds = ServiceAccountCredentials.from_json_keyfile_name(
-                self.credentials_file, scope
+            # Одна сессия с пулом соединений на всё время работы:
+            # TLS-соединения и токен переиспользуются между запросами
+            self._close_session()
+            self._session = AuthorizedSession(creds)
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_POOL_CONNECTIONS,
+                pool_maxsize=HTTP_POOL_MAXSIZE,
             )
+            self._session.mount("https://", adapter)
 
-            self.client = gspread.authorize(creds)
+            self.client = CountingClient(auth=creds, session=self._session)
             self.spreadsheet = self.client.open_by_key(self.sheet_id)
+            self._load_worksheet_cache()
 
             logger.info(
                 f"✅ Google Sheets авторизация успешна: {self.spreadsheet.title}"
@@ -96,66 +311,230 @@ class GoogleSheetsService:
             logger.error(f"❌ Ошибка авторизации Google Sheets: {e}")
             return False
 
+    def _close_session(self):
+        """Закрыть HTTP-сессию gspread (перед повторной авторизацией)"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def refresh_auth(self) -> bool:
+        """
+        Повторная авторизация того же экземпляра сервиса
+
+        Нужна, если авторизация при старте не удалась или токен
+        не обновился: сервис не пересоздаётся, кэши листов сохраняются.
+        """
+        logger.info("🔑 Повторная авторизация Google Sheets...")
+        self._cached_ws = None
+        return self._authorize()
+
+    def _load_worksheet_cache(self):
+        """Загрузить сохранённые на диск свойства листов этой таблицы"""
+        cached = sheets_cache.load_from_cache(
+            WORKSHEET_CACHE_KEY, max_age_hours=WORKSHEET_CACHE_HOURS
+        )
+        if cached and cached.get("spreadsheet_id") == self.spreadsheet.id:
+            self._ws_cache = cached.get("worksheets", {})
+            logger.info(f"📁 Загружено листов из кэша: {len(self._ws_cache)}")
+
+    def _save_worksheet_cache(self):
+        """Сохранить свойства листов на диск"""
+        sheets_cache.save_to_cache(
+            WORKSHEET_CACHE_KEY,
+            {"spreadsheet_id": self.spreadsheet.id, "worksheets": self._ws_cache},
+        )
+
+    def _remember_worksheet(self, *worksheets):
+        """Запомнить листы, чтобы следующие обращения обходились без API"""
+        for worksheet in worksheets:
+            self._ws_cache[worksheet.title] = {
+                "sheetId": worksheet.id,
+                "title": worksheet.title,
+                "index": worksheet.index,
+            }
+        self._save_worksheet_cache()
+
+    def _forget_worksheet(self, title: str):
+        """Убрать лист из кэша (удалён или переименован в таблице)"""
+        if self._cached_ws is not None and self._cached_ws.title == title:
+            self._cached_ws = None
+        self._last_format_signature = None
+        if self._ws_cache.pop(title, None) is not None:
+            self._save_worksheet_cache()
+
+    def _get_worksheet(self, title: str):
+        """
+        Получить лист по названию
+
+        Известные листы собираются из кэша без запроса метаданных таблицы.
+        При промахе один запрос метаданных запоминает сразу все листы.
+
+        Raises:
+            WorksheetNotFound: если листа нет в таблице
+        """
+        if self._cached_ws is not None and self._cached_ws.title == title:
+            return self._cached_ws
+
+        if title not in self._ws_cache:
+            self._remember_worksheet(*self.spreadsheet.worksheets())
+
+        properties = self._ws_cache.get(title)
+        if not properties:
+            raise WorksheetNotFound(title)
+
+        self._cached_ws = gspread.Worksheet(self.spreadsheet, dict(properties))
+        return self._cached_ws
+
+    @staticmethod
+    async def _api(func, *args, **kwargs):
+        """Выполнить блокирующий вызов gspread в потоке, не занимая event loop"""
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    @property
+    def api_requests(self) -> int:
+        """Все запросы к API (чтение и запись) с последней авторизации"""
+        counter = getattr(self.client, "request_counter", None)
+        return sum(counter.values()) if counter else 0
+
+    async def _reserve_write_quota(self, cost: int = 1):
+        """
+        Зарезервировать запросы на запись в текущем минутном окне
+
+        Если запись превысит WRITE_QUOTA_PER_MINUTE, ждём начала
+        следующей минуты вместо того, чтобы получить 429 и уйти в retry.
+        """
+        bucket = int(time.monotonic() // 60)
+        if bucket != self._quota_bucket:
+            self._quota_bucket = bucket
+            self._writes_this_minute = 0
+
+        if self._writes_this_minute + cost > WRITE_QUOTA_PER_MINUTE:
+            wait = 60 - time.monotonic() % 60
+            logger.warning(
+                f"⏳ Лимит записей почти исчерпан ({self._writes_this_minute}), "
+                f"ждём {wait:.0f} с"
+            )
+            await asyncio.sleep(wait)
+            self._quota_bucket = int(time.monotonic() // 60)
+            self._writes_this_minute = 0
+
+        self._writes_this_minute += cost
+        self.write_quota_used += cost
+
     def _get_week_range(self, date: datetime) -> Tuple[datetime, datetime]:
         """
         Получить диапазон текущей недели (понедельник-суббота)
 
         ✅ ИСПРАВЛЕНО: Воскресенье относится к СЛЕДУЮЩЕЙ неделе
         """
+        start_day, end_day = self._week_range_for_date(date.date())
+        day = date.date()
+        return date + (start_day - day), date + (end_day - day)
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _week_range_for_date(day: date_type) -> Tuple[date_type, date_type]:
+        """Понедельник и суббота недели для даты (кэшируется по дню)"""
         # Если воскресенье (weekday=6) → берём следующий понедельник
-        if date.weekday() == 6:
-            start = date + timedelta(days=1)  # Следующий понедельник
+        if day.weekday() == 6:
+            start = day + timedelta(days=1)  # Следующий понедельник
         else:
             # Иначе находим понедельник текущей недели
-            start = date - timedelta(days=date.weekday())
+            start = day - timedelta(days=day.weekday())
 
         end = start + timedelta(days=5)  # Суббота
         return start, end
 
     def _get_week_title(self, start: datetime, end: datetime) -> str:
         """Создать название листа для недели"""
-        months = {
-            1: "Января",
-            2: "Февраля",
-            3: "Марта",
-            4: "Апреля",
-            5: "Мая",
-            6: "Июня",
-            7: "Июля",
-            8: "Августа",
-            9: "Сентября",
-            10: "Октября",
-            11: "Ноября",
-            12: "Декабря",
-        }
+        return self._week_title_for_date(start.date(), end.date())
 
-        month_name = months[start.month]
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _week_title_for_date(start: date_type, end: date_type) -> str:
+        """Название листа недели (кэшируется по датам)"""
+        month_name = MONTHS_RU[start.month - 1]
         return f"Неделя {start.day}-{end.day} {month_name} {start.year}"
 
-    async def _create_weekly_sheet(self) -> Optional[object]:
-        """Создать новый лист для недели с горизонтальным layout"""
+    async def _create_weekly_sheet(
+        self, now: Optional[datetime] = None
+    ) -> Optional[object]:
+        """
+        Создать новый лист для недели с горизонтальным layout
+
+        Args:
+            now: Текущее время (если уже вычислено вызывающим кодом)
+        """
         if not self.client or not self.spreadsheet:
             return None
 
         try:
-            now = datetime.now(self.timezone)
+            if now is None:
+                now = datetime.now(self.timezone)
             start, end = self._get_week_range(now)
             title = self._get_week_title(start, end)
 
             try:
-                worksheet = self.spreadsheet.worksheet(title)
+                worksheet = await self._api(self._get_worksheet, title)
                 logger.info(f"📋 Лист '{title}' уже существует")
                 return worksheet
             except WorksheetNotFound:
                 pass
 
-            # Создаём лист
-            worksheet = self.spreadsheet.add_worksheet(title=title, rows=100, cols=30)
-
-            logger.info(f"✅ Создан новый лист: {title}")
+            # Создаём лист вместе с шириной колонок и шапкой одним batchUpdate.
+            # sheetId задаём сами (дата понедельника), чтобы остальные
+            # запросы в том же batch могли на него ссылаться.
+            sheet_id = int(start.strftime("%Y%m%d"))
+            properties = {
+                "title": title,
+                "gridProperties": {"rowCount": 100, "columnCount": 30},
+            }
+            await self._reserve_write_quota()
+            try:
+                response = await self._api(
+                    self.spreadsheet.batch_update,
+                    {
+                        "requests": [
+                            {
+                                "addSheet": {
+                                    "properties": {"sheetId": sheet_id, **properties}
+                                }
+                            },
+                            *self._column_width_requests(sheet_id),
+                            *self._layout_requests(sheet_id, start, end),
+                        ]
+                    },
+                )
+            except APIError as e:
+                if _api_error_status(e) != 400:
+                    raise
+                # id занят (например, лист этой недели переименовали):
+                # id выбирает Google, оформление уходит вторым batchUpdate
+                logger.warning(
+                    f"⚠️ sheetId {sheet_id} занят - создаём лист без него: {e}"
+                )
+                await self._reserve_write_quota()
+                response = await self._api(
+                    self.spreadsheet.batch_update,
+                    {"requests": [{"addSheet": {"properties": properties}}]},
+                )
+                sheet_id = response["replies"][0]["addSheet"]["properties"]["sheetId"]
+                await self._reserve_write_quota()
+                await self._api(
+                    self.spreadsheet.batch_update,
+                    {
+                        "requests": [
+                            *self._column_width_requests(sheet_id),
+                            *self._layout_requests(sheet_id, start, end),
+                        ]
+                    },
+                )
+            worksheet = gspread.Worksheet(
+                self.spreadsheet, response["replies"][0]["addSheet"]["properties"]
+            )
+            self._remember_worksheet(worksheet)
 
-            # Применяем начальное форматирование
-            await self._setup_dashboard_layout(worksheet, start, end)
+            logger.info(f"✅ Создан новый лист с layout дашборда: {title}")
 
             return worksheet
 
@@ -163,360 +542,201 @@ class GoogleSheetsService:
             logger.error(f"❌ Ошибка создания листа: {e}")
             return None
 
-    async def _setup_dashboard_layout(self, worksheet, start: datetime, end: datetime):
+    @staticmethod
+    def _column_width_requests(sheet_id: int) -> List[Dict]:
+        """Запросы ширины колонок: один запрос на каждый отрезок одинаковой ширины"""
+        requests = []
+        start = 0
+
+        for end in range(1, len(COLUMN_WIDTHS) + 1):
+            if end < len(COLUMN_WIDTHS) and COLUMN_WIDTHS[end] == COLUMN_WIDTHS[start]:
+                continue
+
+            requests.append(
+                {
+                    "updateDimensionProperties": {
+                        "range": {
+                            "sheetId": sheet_id,
+                            "dimension": "COLUMNS",
+                            "startIndex": start,
+                            "endIndex": end,
+                        },
+                        "properties": {"pixelSize": COLUMN_WIDTHS[start]},
+                        "fields": "pixelSize",
+                    }
+                }
+            )
+            start = end
+
+        return requests
+
+    def _layout_requests(
+        self, sheet_id: int, start: datetime, end: datetime
+    ) -> List[Dict]:
         """
         ✅ НОВОЕ: Горизонтальный layout
 
         A-J: ВСЕ ТРУБКИ
         L-U: ПЕРЕЗВОНЫ
         W-Y: ОБЩАЯ СТАТИСТИКА
+
+        Объединения, тексты и оформление шапки (без обращений к API).
         """
-        try:
-            months_ru = {
-                1: "Января",
-                2: "Февраля",
-                3: "Марта",
-                4: "Апреля",
-                5: "Мая",
-                6: "Июня",
-                7: "Июля",
-                8: "Августа",
-                9: "Сентября",
-                10: "Октября",
-                11: "Ноября",
-                12: "Декабря",
-            }
+        week_title = f"📊 СТАТИСТИКА НЕДЕЛИ {start.day}-{end.day} {MONTHS_RU_UPPER[start.month - 1]} {start.year}"
 
-            week_title = f"📊 СТАТИСТИКА НЕДЕЛИ {start.day}-{end.day} {months_ru[start.month].upper()} {start.year}"
+        updated_at = datetime.now(self.timezone).strftime("%d.%m.%Y %H:%M")
 
+        # Объединения и тексты шапки: диапазон → строки значений
+        layout = {
             # ===== ШАПКА =====
-            worksheet.merge_cells("A1:J1")
-            worksheet.update("A1", [[week_title]])
-
+            "A1:J1": [[week_title]],
             # Время обновления
-            worksheet.merge_cells("L1:U1")
-            worksheet.update(
-                "L1",
-                [
-                    [
-                        f"🔄 Обновлено: {datetime.now(self.timezone).strftime('%d.%m.%Y %H:%M')}"
-                    ]
-                ],
-            )
-
+            "L1:U1": [[f"🔄 Обновлено: {updated_at}"]],
             # ===== ТАБЛИЦА 1: ВСЕ ТРУБКИ (A3-J) =====
-            worksheet.merge_cells("A3:J3")
-            worksheet.update("A3", [["📞 ВСЕ ТРУБКИ"]])
-
-            headers_all = [
-                ["№", "Менеджер", "ПН", "ВТ", "СР", "ЧТ", "ПТ", "СБ", "ИТОГО", "ПЛАН"]
-            ]
-            worksheet.update("A4:J4", headers_all)
-
+            "A3:J3": [["📞 ВСЕ ТРУБКИ"]],
             # ===== ТАБЛИЦА 2: ПЕРЕЗВОНЫ (L3-U) =====
-            worksheet.merge_cells("L3:U3")
-            worksheet.update("L3", [["🟢 ПЕРЕЗВОНЫ"]])
-
-            headers_recalls = [
-                ["№", "Менеджер", "ПН", "ВТ", "СР", "ЧТ", "ПТ", "СБ", "ИТОГО", "%"]
-            ]
-            worksheet.update("L4:U4", headers_recalls)
-
+            "L3:U3": [["🟢 ПЕРЕЗВОНЫ"]],
             # ===== ОБЩАЯ СТАТИСТИКА (W3-Y7) =====
-            worksheet.merge_cells("W3:Y3")
-            worksheet.update("W3", [["📊 ОБЩАЯ СТАТИСТИКА"]])
-
-            stats_headers = [
+            "W3:Y3": [["📊 ОБЩАЯ СТАТИСТИКА"]],
+        }
+        headers = {
+            "A4:J4": [
+                ["№", "Менеджер", "ПН", "ВТ", "СР", "ЧТ", "ПТ", "СБ", "ИТОГО", "ПЛАН"]
+            ],
+            "L4:U4": [
+                ["№", "Менеджер", "ПН", "ВТ", "СР", "ЧТ", "ПТ", "СБ", "ИТОГО", "%"]
+            ],
+            "W4:X7": [
                 ["📞 Всего трубок", "0"],
                 ["🟢 Перезвоны", "0"],
                 ["📈 % Перезвонов", "0%"],
                 ["✓ План выполнен", "0/0"],
-            ]
-            worksheet.update("W4:X7", stats_headers)
-
-            # Применяем форматирование
-            self._format_headers(worksheet)
-
-            logger.info("✅ Layout дашборда создан (горизонтальный)")
-
-        except Exception as e:
-            logger.error(f"❌ Ошибка создания layout: {e}")
+            ],
+        }
 
-    def _format_headers(self, worksheet):
-        """Форматирование заголовков и границ"""
-        try:
-            # ===== ЦВЕТА =====
+        requests = [
+            {
+                "mergeCells": {
+                    "range": a1_range_to_grid_range(a1, sheet_id),
+                    "mergeType": "MERGE_ALL",
+                }
+            }
+            for a1 in layout
+        ]
+        requests.extend(
+            self._values_requests(
+                sheet_id,
+                [
+                    {"range": a1, "values": rows}
+                    for a1, rows in {**layout, **headers}.items()
+                ],
+            )
+        )
+        requests.extend(self._header_format_requests(sheet_id))
+        return requests
 
+    @staticmethod
+    def _header_format_requests(sheet_id: int) -> List[Dict]:
+        """repeatCell-запросы оформления заголовков (цвета, шрифты, выравнивание)"""
+        formats = {
             # Главный заголовок (синий)
-            worksheet.format(
-                "A1:J1",
-                {
-                    "backgroundColor": {"red": 0.2, "green": 0.4, "blue": 0.7},
-                    "textFormat": {
-                        "foregroundColor": {"red": 1, "green": 1, "blue": 1},
-                        "bold": True,
-                        "fontSize": 13,
-                    },
-                    "horizontalAlignment": "CENTER",
-                    "verticalAlignment": "MIDDLE",
+            "A1:J1": {
+                "backgroundColor": {"red": 0.2, "green": 0.4, "blue": 0.7},
+                "textFormat": {
+                    "foregroundColor": {"red": 1, "green": 1, "blue": 1},
+                    "bold": True,
+                    "fontSize": 13,
                 },
-            )
-
+                "horizontalAlignment": "CENTER",
+                "verticalAlignment": "MIDDLE",
+            },
             # Время обновления (светло-серый)
-            worksheet.format(
-                "L1:U1",
-                {
-                    "backgroundColor": {"red": 0.85, "green": 0.85, "blue": 0.85},
-                    "textFormat": {"bold": True, "fontSize": 10},
-                    "horizontalAlignment": "CENTER",
-                },
-            )
-
+            "L1:U1": {
+                "backgroundColor": {"red": 0.85, "green": 0.85, "blue": 0.85},
+                "textFormat": {"bold": True, "fontSize": 10},
+                "horizontalAlignment": "CENTER",
+            },
             # Заголовок "ВСЕ ТРУБКИ" (синий)
-            worksheet.format(
-                "A3:J3",
-                {
-                    "backgroundColor": {"red": 0.4, "green": 0.6, "blue": 0.9},
-                    "textFormat": {
-                        "foregroundColor": {"red": 1, "green": 1, "blue": 1},
-                        "bold": True,
-                        "fontSize": 11,
-                    },
-                    "horizontalAlignment": "CENTER",
+            "A3:J3": {
+                "backgroundColor": {"red": 0.4, "green": 0.6, "blue": 0.9},
+                "textFormat": {
+                    "foregroundColor": {"red": 1, "green": 1, "blue": 1},
+                    "bold": True,
+                    "fontSize": 11,
                 },
-            )
-
+                "horizontalAlignment": "CENTER",
+            },
             # Заголовок "ПЕРЕЗВОНЫ" (зелёный)
-            worksheet.format(
-                "L3:U3",
-                {
-                    "backgroundColor": {"red": 0.3, "green": 0.7, "blue": 0.4},
-                    "textFormat": {
-                        "foregroundColor": {"red": 1, "green": 1, "blue": 1},
-                        "bold": True,
-                        "fontSize": 11,
-                    },
-                    "horizontalAlignment": "CENTER",
+            "L3:U3": {
+                "backgroundColor": {"red": 0.3, "green": 0.7, "blue": 0.4},
+                "textFormat": {
+                    "foregroundColor": {"red": 1, "green": 1, "blue": 1},
+                    "bold": True,
+                    "fontSize": 11,
                 },
-            )
-
+                "horizontalAlignment": "CENTER",
+            },
             # Заголовок "ОБЩАЯ СТАТИСТИКА" (оранжевый)
-            worksheet.format(
-                "W3:Y3",
-                {
-                    "backgroundColor": {"red": 1, "green": 0.6, "blue": 0.2},
-                    "textFormat": {
-                        "foregroundColor": {"red": 1, "green": 1, "blue": 1},
-                        "bold": True,
-                        "fontSize": 11,
-                    },
-                    "horizontalAlignment": "CENTER",
+            "W3:Y3": {
+                "backgroundColor": {"red": 1, "green": 0.6, "blue": 0.2},
+                "textFormat": {
+                    "foregroundColor": {"red": 1, "green": 1, "blue": 1},
+                    "bold": True,
+                    "fontSize": 11,
                 },
-            )
-
+                "horizontalAlignment": "CENTER",
+            },
             # Заголовки колонок (светлые)
-            worksheet.format(
-                "A4:J4",
-                {
-                    "backgroundColor": {"red": 0.85, "green": 0.9, "blue": 1},
-                    "textFormat": {"bold": True, "fontSize": 9},
-                    "horizontalAlignment": "CENTER",
-                },
-            )
-
-            worksheet.format(
-                "L4:U4",
-                {
-                    "backgroundColor": {"red": 0.85, "green": 1, "blue": 0.9},
-                    "textFormat": {"bold": True, "fontSize": 9},
-                    "horizontalAlignment": "CENTER",
-                },
-            )
-
+            "A4:J4": {
+                "backgroundColor": {"red": 0.85, "green": 0.9, "blue": 1},
+                "textFormat": {"bold": True, "fontSize": 9},
+                "horizontalAlignment": "CENTER",
+            },
+            "L4:U4": {
+                "backgroundColor": {"red": 0.85, "green": 1, "blue": 0.9},
+                "textFormat": {"bold": True, "fontSize": 9},
+                "horizontalAlignment": "CENTER",
+            },
             # Заголовки статистики
-            worksheet.format(
-                "W4:Y7",
-                {
-                    "backgroundColor": {"red": 1, "green": 0.9, "blue": 0.7},
-                    "textFormat": {"bold": True, "fontSize": 9},
-                    "horizontalAlignment": "LEFT",
-                },
-            )
+            "W4:Y7": {
+                "backgroundColor": {"red": 1, "green": 0.9, "blue": 0.7},
+                "textFormat": {"bold": True, "fontSize": 9},
+                "horizontalAlignment": "LEFT",
+            },
+        }
 
-            # ===== ШИРИНА КОЛОНОК =====
-            body = {
-                "requests": [
-                    # ВСЕ ТРУБКИ
-                    {
-                        "updateDimensionProperties": {
-                            "range": {
-                                "sheetId": worksheet.id,
-                                "dimension": "COLUMNS",
-                                "startIndex": 0,
-                                "endIndex": 1,
-                            },
-                            "properties": {"pixelSize": 40},
-                            "fields": "pixelSize",
-                        }
-                    },
-                    {
-                        "updateDimensionProperties": {
-                            "range": {
-                                "sheetId": worksheet.id,
-                                "dimension": "COLUMNS",
-                                "startIndex": 1,
-                                "endIndex": 2,
-                            },
-                            "properties": {"pixelSize": 120},
-                            "fields": "pixelSize",
-                        }
-                    },
-                    {
-                        "updateDimensionProperties": {
-                            "range": {
-                                "sheetId": worksheet.id,
-                                "dimension": "COLUMNS",
-                                "startIndex": 2,
-                                "endIndex": 8,
-                            },
-                            "properties": {"pixelSize": 45},
-                            "fields": "pixelSize",
-                        }
-                    },
-                    {
-                        "updateDimensionProperties": {
-                            "range": {
-                                "sheetId": worksheet.id,
-                                "dimension": "COLUMNS",
-                                "startIndex": 8,
-                                "endIndex": 9,
-                            },
-                            "properties": {"pixelSize": 60},
-                            "fields": "pixelSize",
-                        }
-                    },
-                    {
-                        "updateDimensionProperties": {
-                            "range": {
-                                "sheetId": worksheet.id,
-                                "dimension": "COLUMNS",
-                                "startIndex": 9,
-                                "endIndex": 10,
-                            },
-                            "properties": {"pixelSize": 50},
-                            "fields": "pixelSize",
-                        }
-                    },
-                    # Пробел
-                    {
-                        "updateDimensionProperties": {
-                            "range": {
-                                "sheetId": worksheet.id,
-                                "dimension": "COLUMNS",
-                                "startIndex": 10,
-                                "endIndex": 11,
-                            },
-                            "properties": {"pixelSize": 20},
-                            "fields": "pixelSize",
-                        }
-                    },
-                    # ПЕРЕЗВОНЫ
-                    {
-                        "updateDimensionProperties": {
-                            "range": {
-                                "sheetId": worksheet.id,
-                                "dimension": "COLUMNS",
-                                "startIndex": 11,
-                                "endIndex": 12,
-                            },
-                            "properties": {"pixelSize": 40},
-                            "fields": "pixelSize",
-                        }
-                    },
-                    {
-                        "updateDimensionProperties": {
-                            "range": {
-                                "sheetId": worksheet.id,
-                                "dimension": "COLUMNS",
-                                "startIndex": 12,
-                                "endIndex": 13,
-                            },
-                            "properties": {"pixelSize": 120},
-                            "fields": "pixelSize",
-                        }
-                    },
-                    {
-                        "updateDimensionProperties": {
-                            "range": {
-                                "sheetId": worksheet.id,
-                                "dimension": "COLUMNS",
-                                "startIndex": 13,
-                                "endIndex": 19,
-                            },
-                            "properties": {"pixelSize": 45},
-                            "fields": "pixelSize",
-                        }
-                    },
-                    {
-                        "updateDimensionProperties": {
-                            "range": {
-                                "sheetId": worksheet.id,
-                                "dimension": "COLUMNS",
-                                "startIndex": 19,
-                                "endIndex": 20,
-                            },
-                            "properties": {"pixelSize": 60},
-                            "fields": "pixelSize",
-                        }
-                    },
-                    {
-                        "updateDimensionProperties": {
-                            "range": {
-                                "sheetId": worksheet.id,
-                                "dimension": "COLUMNS",
-                                "startIndex": 20,
-                                "endIndex": 21,
-                            },
-                            "properties": {"pixelSize": 50},
-                            "fields": "pixelSize",
-                        }
-                    },
-                    # Пробел
-                    {
-                        "updateDimensionProperties": {
-                            "range": {
-                                "sheetId": worksheet.id,
-                                "dimension": "COLUMNS",
-                                "startIndex": 21,
-                                "endIndex": 22,
-                            },
-                            "properties": {"pixelSize": 20},
-                            "fields": "pixelSize",
-                        }
-                    },
-                    # СТАТИСТИКА
-                    {
-                        "updateDimensionProperties": {
-                            "range": {
-                                "sheetId": worksheet.id,
-                                "dimension": "COLUMNS",
-                                "startIndex": 22,
-                                "endIndex": 25,
-                            },
-                            "properties": {"pixelSize": 120},
-                            "fields": "pixelSize",
-                        }
-                    },
-                ]
+        return [
+            {
+                "repeatCell": {
+                    "range": a1_range_to_grid_range(a1_range, sheet_id),
+                    "cell": {"userEnteredFormat": cell_format},
+                    "fields": f"userEnteredFormat({','.join(cell_format)})",
+                }
             }
-            self.spreadsheet.batch_update(body)
+            for a1_range, cell_format in formats.items()
+        ]
 
-            logger.info("✅ Форматирование применено")
+    async def _get_week_stats_cached(
+        self, start_date: datetime, end_date: datetime
+    ) -> Tuple[Dict, Dict]:
+        """
+        Статистика по дням с общим кэшем в пределах одной минуты
 
-        except Exception as e:
-            logger.error(f"❌ Ошибка форматирования: {e}")
+        Повторный вызов в ту же минуту (например, ручной запуск рядом
+        с плановым) переиспользует уже полученные данные без запросов
+        к Apps Script.
+        """
+        bucket = int(time.monotonic() // STATS_CACHE_BUCKET_SECONDS)
+        key = (start_date.date(), bucket)
+
+        if self._week_stats_cache and self._week_stats_cache[0] == key:
+            logger.debug("♻️ Статистика недели взята из кэша")
+            return self._week_stats_cache[1]
+
+        result = await self._get_week_stats_by_days(start_date, end_date)
+        self._week_stats_cache = (key, result)
+        return result
 
-    @retry(**API_RETRY_CONFIG)
     async def _get_week_stats_by_days(
         self, start_date: datetime, end_date: datetime
     ) -> Tuple[Dict, Dict]:
@@ -526,110 +746,70 @@ class GoogleSheetsService:
         Пропускает несуществующие листы БЕЗ ошибок.
         """
         try:
-            all_tubes_by_days = {}
-            recalls_by_days = {}
-
-            # Инициализируем для всех менеджеров
-            for manager_name in PAVLOGRAD_MANAGERS:
-                all_tubes_by_days[manager_name] = {
-                    "ПН": 0,
-                    "ВТ": 0,
-                    "СР": 0,
-                    "ЧТ": 0,
-                    "ПТ": 0,
-                    "СБ": 0,
-                }
-                recalls_by_days[manager_name] = {
-                    "ПН": 0,
-                    "ВТ": 0,
-                    "СР": 0,
-                    "ЧТ": 0,
-                    "ПТ": 0,
-                    "СБ": 0,
-                }
+            all_tubes_by_days = {
+                manager_name: dict.fromkeys(DAY_NAMES, 0)
+                for manager_name in PAVLOGRAD_MANAGERS
+            }
+            recalls_by_days = {
+                manager_name: dict.fromkeys(DAY_NAMES, 0)
+                for manager_name in PAVLOGRAD_MANAGERS
+            }
 
             # ✅ КРИТИЧНО: Обрабатываем ТОЛЬКО дни <= сегодня
             today = datetime.now(self.timezone).date()
 
+            days = []
             current_date = start_date
-            day_names = ["ПН", "ВТ", "СР", "ЧТ", "ПТ", "СБ"]
 
             while current_date <= end_date:
+                day_name = DAY_NAMES[current_date.weekday()]
+                date_str = current_date.strftime("%d.%m")
+
                 # ✅ Пропускаем будущие дни
                 if current_date.date() > today:
-                    day_index = current_date.weekday()
-                    day_name = day_names[day_index]
-                    logger.info(
-                        f"⏭ Пропускаем {day_name} ({current_date.strftime('%d.%m')}) - будущая дата"
-                    )
-                    current_date += timedelta(days=1)
-                    continue
+                    logger.info(f"⏭ Пропускаем {day_name} ({date_str}) - будущая дата")
+                else:
+                    days.append((day_name, date_str, current_date.date() == today))
 
-                day_index = current_date.weekday()
-                day_name = day_names[day_index]
-                date_str = current_date.strftime("%d.%m")
+                current_date += timedelta(days=1)
 
-                logger.info(f"📅 Обработка {day_name} ({date_str})")
+            # Все дни запрашиваются параллельно через общую сессию
+            logger.info(f"📅 Запрос данных за {len(days)} дн.")
+            session = await self._get_http()
+            results = await asyncio.gather(
+                *(
+                    self._fetch_managers_data_for_date(
+                        session, date_str, is_today=is_today
+                    )
+                    for _, date_str, is_today in days
+                ),
+                return_exceptions=True,
+            )
 
-                # Получаем данные за этот день
-                raw_data = await self._fetch_managers_data_for_date(date_str)
+            for (day_name, date_str, _), raw_data in zip(days, results):
+                if isinstance(raw_data, BaseException):
+                    raise raw_data
 
                 # ✅ Если лист не найден - пропускаем БЕЗ ошибки
                 if raw_data is None:
                     logger.info(
                         f"⏭ {day_name} ({date_str}): лист не найден, пропускаем"
                     )
-                    current_date += timedelta(days=1)
                     continue
 
                 # Обрабатываем данные этого дня
-                stats_day = {}
-                recalls_day = {}
-
-                for row in raw_data:
-                    manager = row.get("менеджер", "").strip()
-                    color = row.get("цвет", "").strip()
-
-                    if not manager or not color:
-                        continue
-
-                    manager_lower = manager.lower()
-                    normalized_name = NAME_MAP.get(manager_lower, manager)
-
-                    # Пропускаем если менеджер не в списке
-                    if normalized_name not in PAVLOGRAD_MANAGERS:
-                        continue
-
-                    # ВСЕ ТРУБКИ
-                    if normalized_name not in stats_day:
-                        stats_day[normalized_name] = 0
-                    stats_day[normalized_name] += 1
-
-                    # ПЕРЕЗВОНЫ (только зелёные)
-                    if color == "ЗЕЛЕНЫЙ":
-                        if normalized_name not in recalls_day:
-                            recalls_day[normalized_name] = 0
-                        recalls_day[normalized_name] += 1
-
-                # Сохраняем данные этого дня
-                for manager_name in PAVLOGRAD_MANAGERS:
-                    if manager_name in stats_day:
-                        all_tubes_by_days[manager_name][day_name] = stats_day[
-                            manager_name
-                        ]
+                stats_day, recalls_day = self._count_day_rows(raw_data)
 
-                    if manager_name in recalls_day:
-                        recalls_by_days[manager_name][day_name] = recalls_day[
-                            manager_name
-                        ]
+                # Сохраняем данные этого дня (только встретившиеся менеджеры)
+                for manager_name, count in stats_day.items():
+                    all_tubes_by_days[manager_name][day_name] = count
+                for manager_name, count in recalls_day.items():
+                    recalls_by_days[manager_name][day_name] = count
 
                 logger.info(
                     f"✅ {day_name}: трубок={sum(stats_day.values())}, перезвонов={sum(recalls_day.values())}"
                 )
 
-                # Переходим к следующему дню
-                current_date += timedelta(days=1)
-
             logger.info("✅ Статистика по дням собрана")
             return all_tubes_by_days, recalls_by_days
 
@@ -637,18 +817,92 @@ class GoogleSheetsService:
             logger.error(f"❌ Ошибка получения статистики по дням: {e}")
             raise
 
+    async def _get_http(self) -> aiohttp.ClientSession:
+        """
+        Общая HTTP-сессия к Apps Script (пул соединений, keep-alive)
+
+        Сессия привязана к event loop, поэтому пересоздаётся,
+        если вызов пришёл из другого loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http.closed or self._http_loop is not loop:
+            self._http = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=15),
+                connector=aiohttp.TCPConnector(limit=10, ttl_dns_cache=300),
+            )
+            self._http_loop = loop
+        return self._http
+
+    async def close(self):
+        """Закрыть HTTP-сессию (при остановке или перед закрытием event loop)"""
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        self._http = None
+        self._http_loop = None
+
+    @staticmethod
+    def _count_day_rows(raw_data: List[Dict]) -> Tuple[Counter, Counter]:
+        """Трубки и перезвоны (зелёные) менеджеров из списка за один день"""
+        known = [
+            (name, color)
+            for name, color in (
+                (
+                    _normalize_manager_name(row.get("менеджер", "")),
+                    row.get("цвет", "").strip(),
+                )
+                for row in raw_data
+            )
+            if color and name in _MANAGERS_SET
+        ]
+        stats_day = Counter(name for name, _ in known)
+        recalls_day = Counter(name for name, color in known if color == "ЗЕЛЕНЫЙ")
+        return stats_day, recalls_day
+
     async def _fetch_managers_data_for_date(
-        self, date_str: str
+        self,
+        session: aiohttp.ClientSession,
+        date_str: str,
+        is_today: Optional[bool] = None,
     ) -> Optional[List[Dict]]:
         """
         ✅ ИСПРАВЛЕНО: Возвращает None если лист не найден (вместо Exception)
 
+        Дни, запрошенные уже после их окончания, кэшируются на сутки;
+        сегодняшний день и ненайденные листы — на минуту. Снимок,
+        снятый днём, после полуночи живёт не дольше минуты, поэтому
+        вечерние строки и правки попадают в недельный лист.
+
         Args:
+            session: Общая HTTP-сессия для всех дней недели
             date_str: Дата в формате DD.MM (например "15.12")
+            is_today: Это сегодняшний день (None — определить по текущему времени)
 
         Returns:
             Список словарей с данными или None если лист не найден
         """
+        if is_today is None:
+            is_today = date_str == datetime.now(self.timezone).strftime("%d.%m")
+
+        cached = self._day_cache.get(date_str)
+        if cached:
+            cached_at, fetched_as_past, cached_data = cached
+            ttl = (
+                DAY_CACHE_PAST_SECONDS
+                if fetched_as_past and cached_data is not None
+                else DAY_CACHE_TODAY_SECONDS
+            )
+            if time.monotonic() - cached_at < ttl:
+                logger.debug(f"♻️ Данные за {date_str} взяты из кэша")
+                return cached_data
+
+        data = await self._request_managers_data(session, date_str)
+        self._day_cache[date_str] = (time.monotonic(), not is_today, data)
+        return data
+
+    async def _request_managers_data(
+        self, session: aiohttp.ClientSession, date_str: str
+    ) -> Optional[List[Dict]]:
+        """HTTP-запрос данных менеджеров за день к Apps Script"""
         url = settings.GOOGLE_APPS_SCRIPT_URL
 
         if not url:
@@ -660,41 +914,38 @@ class GoogleSheetsService:
         logger.debug(f"🔗 Запрос: {url}?action=managers&date={date_str}")
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    url, params=params, timeout=aiohttp.ClientTimeout(total=15)
-                ) as response:
-                    if response.status != 200:
-                        logger.error(f"❌ HTTP ошибка: {response.status}")
-                        raise Exception(f"HTTP {response.status}")
-
-                    content_type = response.headers.get("Content-Type", "")
-
-                    if "text/html" in content_type:
-                        html_text = await response.text()
-                        logger.error("❌ Apps Script вернул HTML вместо JSON!")
-                        logger.error(html_text[:500])
-                        raise ValueError("Apps Script вернул HTML вместо JSON")
-
-                    data = await response.json()
-
-                    # ✅ КРИТИЧНО: Если лист не найден - возвращаем None
-                    if isinstance(data, dict) and "error" in data:
-                        if "не найден" in data["error"]:
-                            logger.debug(
-                                f"📭 Лист {date_str} не найден (это нормально для будущих дней)"
-                            )
-                            return None
-                        else:
-                            logger.error(f"❌ Ошибка от скрипта: {data['error']}")
-                            raise Exception(data["error"])
-
-                    if not isinstance(data, list):
-                        logger.error(f"❌ Неожиданный формат данных: {type(data)}")
-                        raise ValueError("Apps Script вернул не список")
-
-                    logger.debug(f"✅ Получено {len(data)} записей за {date_str}")
-                    return data
+            async with session.get(url, params=params) as response:
+                if response.status != 200:
+                    logger.error(f"❌ HTTP ошибка: {response.status}")
+                    raise Exception(f"HTTP {response.status}")
+
+                raw = await response.read()
+
+                # JSON начинается с [ или {, иначе это HTML-страница ошибки
+                if raw.lstrip()[:1] not in (b"[", b"{"):
+                    logger.error("❌ Apps Script вернул HTML вместо JSON!")
+                    logger.error(raw[:500].decode("utf-8", errors="replace"))
+                    raise ValueError("Apps Script вернул HTML вместо JSON")
+
+                data = orjson.loads(raw)
+
+                # ✅ КРИТИЧНО: Если лист не найден - возвращаем None
+                if isinstance(data, dict) and "error" in data:
+                    if "не найден" in data["error"]:
+                        logger.debug(
+                            f"📭 Лист {date_str} не найден (это нормально для будущих дней)"
+                        )
+                        return None
+                    else:
+                        logger.error(f"❌ Ошибка от скрипта: {data['error']}")
+                        raise Exception(data["error"])
+
+                if not isinstance(data, list):
+                    logger.error(f"❌ Неожиданный формат данных: {type(data)}")
+                    raise ValueError("Apps Script вернул не список")
+
+                logger.debug(f"✅ Получено {len(data)} записей за {date_str}")
+                return data
 
         except aiohttp.ClientError as e:
             logger.error(f"❌ Ошибка HTTP запроса: {e}", exc_info=True)
@@ -703,111 +954,267 @@ class GoogleSheetsService:
             logger.error(f"❌ Ошибка получения данных: {e}")
             raise
 
-    def _calculate_gradient_color(self, value: int, min_val: int, max_val: int) -> dict:
+    @staticmethod
+    def _borders_request(
+        sheet_id: int, start_row: int, end_row: int, start_col: int, end_col: int
+    ) -> Dict:
+        """updateBorders: толстая внешняя и тонкая внутренняя сетка"""
+        return {
+            "updateBorders": {
+                "range": {
+                    "sheetId": sheet_id,
+                    "startRowIndex": start_row,
+                    "endRowIndex": end_row,
+                    "startColumnIndex": start_col,
+                    "endColumnIndex": end_col,
+                },
+                "top": OUTER_BORDER,
+                "bottom": OUTER_BORDER,
+                "left": OUTER_BORDER,
+                "right": OUTER_BORDER,
+                "innerHorizontal": INNER_BORDER,
+                "innerVertical": INNER_BORDER,
+            }
+        }
+
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _gradient_cell(value: int, min_val: int, max_val: int) -> Dict:
+        """
+        Ячейка с градиентным фоном и жирным шрифтом
+
+        Итоги у менеджеров часто совпадают, поэтому ячейки кэшируются
+        по (value, min, max). Возвращаемый dict общий — не изменять.
+        """
+        return {
+            "userEnteredFormat": {
+                "backgroundColor": GoogleSheetsService._calculate_gradient_color(
+                    value, min_val, max_val
+                ),
+                "textFormat": BOLD_TEXT,
+            }
+        }
+
+    @staticmethod
+    def _calculate_gradient_color(value: int, min_val: int, max_val: int) -> dict:
         """Расчёт цвета градиента"""
         if max_val == min_val or max_val == 0:
-            return {"red": 1, "green": 1, "blue": 0.7}
+            return GRADIENT_MID
 
         normalized = (value - min_val) / (max_val - min_val)
 
         if normalized >= 0.75:
-            return {"red": 0.7, "green": 0.9, "blue": 0.7}
+            return GRADIENT_HIGH
         elif normalized >= 0.25:
-            return {"red": 1, "green": 1, "blue": 0.7}
+            return GRADIENT_MID
         else:
-            return {"red": 1, "green": 0.7, "blue": 0.7}
+            return GRADIENT_LOW
 
     @retry(**API_RETRY_CONFIG)
     async def update_stats(self):
         """
         ✅ ГЛАВНАЯ ФУНКЦИЯ: Обновить статистику
         """
-        if not self.client or not self.spreadsheet:
-            raise Exception("Google Sheets сервис не инициализирован")
+        now = datetime.now(self.timezone)
+        weekday = now.weekday()
 
-        try:
-            now = datetime.now(self.timezone)
+        # Пропускаем воскресенье до любых обращений к API
+        if weekday == 6:
+            logger.info("📅 Воскресенье - обновление статистики пропущено")
+            return
 
-            # Пропускаем воскресенье
-            if now.weekday() == 6:
-                logger.info("📅 Воскресенье - обновление статистики пропущено")
-                return
+        if not self.client or not self.spreadsheet:
+            if not await self._api(self.refresh_auth):
+                raise Exception("Google Sheets сервис не инициализирован")
 
-            start, end = self._get_week_range(now)
-            title = self._get_week_title(start, end)
+        start, end = self._get_week_range(now)
+        title = self._get_week_title(start, end)
 
-            logger.info(f"🔄 Обновление дашборда: {title}")
-            logger.info(
-                f"📅 Период: {start.strftime('%d.%m')} - {end.strftime('%d.%m')}"
-            )
+        logger.info(f"🔄 Обновление дашборда: {title}")
+        requests_before = Counter(getattr(self.client, "request_counter", {}))
+        logger.info(f"📅 Период: {start.strftime('%d.%m')} - {end.strftime('%d.%m')}")
 
-            # 1. Получение или создание листа
-            try:
-                worksheet = self.spreadsheet.worksheet(title)
-            except WorksheetNotFound:
-                worksheet = await self._create_weekly_sheet()
-                if not worksheet:
-                    raise Exception("Не удалось создать лист")
+        # 1-2. Лист и статистика ПО ДНЯМ независимы — запрашиваем параллельно
+        worksheet, (all_tubes_by_days, recalls_by_days) = await asyncio.gather(
+            self._get_or_create_worksheet(title, now),
+            self._get_week_stats_cached(start, end),
+        )
 
-            # 2. Получение статистики ПО ДНЯМ
-            all_tubes_by_days, recalls_by_days = await self._get_week_stats_by_days(
-                start, end
-            )
+        # 3. Подсчёт итогов
+        all_totals = {}
+        recalls_totals = {}
 
-            # 3. Подсчёт итогов
-            all_totals = {}
-            recalls_totals = {}
+        for manager_name in PAVLOGRAD_MANAGERS:
+            all_totals[manager_name] = sum(all_tubes_by_days[manager_name].values())
+            recalls_totals[manager_name] = sum(recalls_by_days[manager_name].values())
 
-            for manager_name in PAVLOGRAD_MANAGERS:
-                all_totals[manager_name] = sum(all_tubes_by_days[manager_name].values())
-                recalls_totals[manager_name] = sum(
-                    recalls_by_days[manager_name].values()
+        # 4. Данные дашборда
+        updates = self._prepare_dashboard_updates(
+            all_tubes_by_days, recalls_by_days, all_totals, recalls_totals, now
+        )
+
+        # 5. Запросы собираются под конкретный лист: если sheetId из кэша
+        # устарел, _commit_updates соберёт их заново для найденного листа
+        def build_requests(sheet) -> Tuple[List[Dict], str]:
+            requests = self._values_requests(sheet.id, updates)
+
+            # Границы и градиенты (только если лист или итоги изменились)
+            signature = self._format_signature(sheet.id, all_totals, recalls_totals)
+            if signature != self._last_format_signature:
+                requests.extend(
+                    self._prepare_formatting_requests(
+                        sheet.id, all_totals, recalls_totals
+                    )
                 )
+            else:
+                logger.info("⏭ Итоги не изменились - форматирование пропущено")
+            return requests, signature
 
-            # 4. Обновление данных
-            await self._update_dashboard_data(
-                worksheet,
-                all_tubes_by_days,
-                recalls_by_days,
-                all_totals,
-                recalls_totals,
-                now,
-            )
+        # 6. Всё одним запросом
+        self._last_format_signature = await self._commit_updates(
+            worksheet, build_requests, now
+        )
 
-            # 5. Применение границ и градиентов
-            await self._apply_borders_and_formatting(
-                worksheet, all_totals, recalls_totals
-            )
+        self._log_request_usage(requests_before)
+        logger.info("✅ Дашборд обновлён успешно")
 
-            logger.info("✅ Дашборд обновлён успешно")
+    async def _get_or_create_worksheet(self, title: str, now: datetime):
+        """
+        Найти лист недели, а если его нет — создать
 
-        except Exception as e:
-            logger.error(f"❌ Ошибка обновления статистики: {e}")
-            import traceback
+        Все обращения к gspread идут через to_thread, поэтому ожидание
+        ответа Google не блокирует event loop. Лист текущей недели
+        берётся из памяти без перехода в поток.
+        """
+        if self._cached_ws is not None and self._cached_ws.title == title:
+            return self._cached_ws
 
-            logger.error(traceback.format_exc())
-            raise
+        try:
+            return await self._api(self._get_worksheet, title)
+        except WorksheetNotFound:
+            pass
+
+        worksheet = await self._create_weekly_sheet(now)
+        if not worksheet:
+            raise Exception("Не удалось создать лист")
+        self._last_format_signature = None
+        return worksheet
+
+    def _log_request_usage(self, before: Counter):
+        """Залогировать запросы к API, сделанные с момента снимка before"""
+        counter = getattr(self.client, "request_counter", None)
+        if counter is None:
+            return
 
-    async def _update_dashboard_data(
+        used = counter - before
+        reads = sum(n for op, n in used.items() if op.endswith(("Get", ":get")))
+        writes = sum(used.values()) - reads
+        logger.info(f"📊 Запросы к API: записи={writes}, чтения={reads} {dict(used)}")
+
+    async def _commit_updates(
         self,
         worksheet,
+        build_requests: Callable[[gspread.Worksheet], Tuple[List[Dict], str]],
+        now: datetime,
+    ) -> str:
+        """
+        Отправить значения и оформление дашборда одним spreadsheets.batchUpdate
+
+        Если sheetId из кэша устарел (лист удалён или пересоздан, Google
+        отвечает 400 про сетку листа), лист находится заново и пакет
+        повторяется один раз. Остальные ошибки кэш листов не трогают.
+
+        Returns:
+            Сигнатура отправленного оформления
+        """
+        for attempt in (1, 2):
+            requests, signature = build_requests(worksheet)
+            logger.info(f"📤 Отправка {len(requests)} запросов...")
+            await self._reserve_write_quota()
+            try:
+                await self._api(self.spreadsheet.batch_update, {"requests": requests})
+                return signature
+            except RefreshError as e:
+                # Токен не обновился: авторизуемся заново, повтор сделает @retry
+                logger.error(f"❌ Ошибка обновления токена Google: {e}")
+                await self._api(self.refresh_auth)
+                raise
+            except APIError as e:
+                logger.error(f"❌ Ошибка записи данных в лист '{worksheet.title}': {e}")
+                # 429/5xx повторит @retry: метаданные листа при этом не сбрасываем
+                if not _is_stale_sheet_error(e):
+                    raise
+                self._forget_worksheet(worksheet.title)
+                if attempt == 2:
+                    raise
+                logger.warning("🔄 Лист из кэша устарел - повтор с актуальным листом")
+                worksheet = await self._get_or_create_worksheet(worksheet.title, now)
+
+    @staticmethod
+    def _values_requests(sheet_id: int, updates: List[Dict]) -> List[Dict]:
+        """
+        Перевести обновления {range, values} в updateCells-запросы
+
+        Каждый запрос привязан к левой верхней ячейке диапазона, поэтому
+        ячейки вне переданного массива не затрагиваются. Числа пишутся как
+        numberValue, строки с "=" — как формулы, None — очистка ячейки
+        (пустое значение при fields="userEnteredValue"), остальное — как
+        текст. Формат ячеек не меняется.
+        """
+        requests = []
+        for update in updates:
+            row, col = a1_to_rowcol(update["range"].split(":")[0])
+            rows = [
+                {"values": [GoogleSheetsService._cell_value(v) for v in values]}
+                for values in update["values"]
+            ]
+            requests.append(
+                {
+                    "updateCells": {
+                        "start": {
+                            "sheetId": sheet_id,
+                            "rowIndex": row - 1,
+                            "columnIndex": col - 1,
+                        },
+                        "rows": rows,
+                        "fields": "userEnteredValue",
+                    }
+                }
+            )
+        return requests
+
+    @staticmethod
+    def _cell_value(value) -> Dict:
+        """userEnteredValue для одного значения ячейки (None — очистить)"""
+        if value is None:
+            return {}
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return {"userEnteredValue": {"numberValue": value}}
+        value = str(value)
+        if value.startswith("="):
+            return {"userEnteredValue": {"formulaValue": value}}
+        return {"userEnteredValue": {"stringValue": value}}
+
+    def _prepare_dashboard_updates(
+        self,
         all_tubes_by_days: Dict,
         recalls_by_days: Dict,
         all_totals: Dict,
         recalls_totals: Dict,
         now: datetime,
-    ):
+    ) -> List[Dict]:
         """
-        Обновление всех данных дашборда (горизонтальный layout)
+        Подготовка всех данных дашборда (горизонтальный layout)
+
+        Чистая функция без обращений к API: возвращает список обновлений
+        {range, values} в A1-нотации (см. _values_requests).
         """
         updates = []
 
         # ===== ОБЩАЯ СТАТИСТИКА (W4-X7) =====
         total_tubes = sum(all_totals.values())
         total_recalls = sum(recalls_totals.values())
-        recall_percent = (
-            int((total_recalls / total_tubes * 100)) if total_tubes > 0 else 0
-        )
+        recall_percent = self._percent(total_recalls, total_tubes)
         plan_completed = sum(1 for total in all_totals.values() if total >= WEEKLY_PLAN)
 
         updates.append(
@@ -822,319 +1229,178 @@ class GoogleSheetsService:
             }
         )
 
-        # ===== ТАБЛИЦА 1: ВСЕ ТРУБКИ (A5-J) =====
-        all_tubes_data = []
-        for idx, manager_name in enumerate(PAVLOGRAD_MANAGERS, 1):
-            days_data = all_tubes_by_days[manager_name]
-            total = all_totals[manager_name]
-            plan_status = "✓" if total >= WEEKLY_PLAN else "✗"
-
-            row = [
-                idx,
-                manager_name,
-                days_data["ПН"],
-                days_data["ВТ"],
-                days_data["СР"],
-                days_data["ЧТ"],
-                days_data["ПТ"],
-                days_data["СБ"],
-                total,
-                plan_status,
-            ]
-            all_tubes_data.append(row)
-
         start_row = 5
-        end_row = start_row + len(all_tubes_data) - 1
+        end_row = start_row + len(PAVLOGRAD_MANAGERS) - 1
+        total_row = end_row + 1  # Строка ИТОГО с формулами SUM
 
-        updates.append({"range": f"A{start_row}:J{end_row}", "values": all_tubes_data})
-
-        # ===== ТАБЛИЦА 2: ПЕРЕЗВОНЫ (L5-U) =====
-        recalls_data = []
-
-        for idx, manager_name in enumerate(PAVLOGRAD_MANAGERS, 1):
-            days_data = recalls_by_days[manager_name]
-            total = recalls_totals[manager_name]
-            total_tubes = all_totals[manager_name]
-            percent = int((total / total_tubes * 100)) if total_tubes > 0 else 0
-
-            row = [
+        # ===== ТАБЛИЦА 1: ВСЕ ТРУБКИ (A5-J) =====
+        all_tubes_data = [
+            [
                 idx,
                 manager_name,
-                days_data["ПН"],
-                days_data["ВТ"],
-                days_data["СР"],
-                days_data["ЧТ"],
-                days_data["ПТ"],
-                days_data["СБ"],
-                total,
-                f"{percent}%",
+                *_day_values(all_tubes_by_days[manager_name]),
+                all_totals[manager_name],
+                "✓" if all_totals[manager_name] >= WEEKLY_PLAN else "✗",
             ]
-            recalls_data.append(row)
-
-        recalls_start_row = 5
-        recalls_end_row = recalls_start_row + len(recalls_data) - 1
-
-        updates.append(
-            {
-                "range": f"L{recalls_start_row}:U{recalls_end_row}",
-                "values": recalls_data,
-            }
+            for idx, manager_name in enumerate(PAVLOGRAD_MANAGERS, 1)
+        ]
+        all_tubes_data.append(
+            self._total_row_values(TUBES_SUM_COLS, start_row, end_row)
         )
-
-        # ===== ИТОГО =====
-        total_row = end_row + 1
-        recalls_total_row = recalls_end_row + 1
-
-        # Итого для всех трубок
         updates.append(
-            {"range": f"A{total_row}:B{total_row}", "values": [["", "ИТОГО:"]]}
+            {"range": f"A{start_row}:J{total_row}", "values": all_tubes_data}
         )
 
-        for col_letter in ["C", "D", "E", "F", "G", "H", "I"]:
-            updates.append(
-                {
-                    "range": f"{col_letter}{total_row}",
-                    "values": [
-                        [f"=SUM({col_letter}{start_row}:{col_letter}{end_row})"]
-                    ],
-                }
-            )
-
-        # Итого для перезвонов
-        updates.append(
-            {
-                "range": f"L{recalls_total_row}:M{recalls_total_row}",
-                "values": [["", "ИТОГО:"]],
-            }
+        # ===== ТАБЛИЦА 2: ПЕРЕЗВОНЫ (L5-U) =====
+        recalls_data = [
+            [
+                idx,
+                manager_name,
+                *_day_values(recalls_by_days[manager_name]),
+                recalls_totals[manager_name],
+                f"{self._percent(recalls_totals[manager_name], all_totals[manager_name])}%",
+            ]
+            for idx, manager_name in enumerate(PAVLOGRAD_MANAGERS, 1)
+        ]
+        recalls_data.append(
+            self._total_row_values(RECALLS_SUM_COLS, start_row, end_row)
         )
-
-        for col_letter in ["N", "O", "P", "Q", "R", "S", "T"]:
-            updates.append(
-                {
-                    "range": f"{col_letter}{recalls_total_row}",
-                    "values": [
-                        [
-                            f"=SUM({col_letter}{recalls_start_row}:{col_letter}{recalls_end_row})"
-                        ]
-                    ],
-                }
-            )
+        updates.append({"range": f"L{start_row}:U{total_row}", "values": recalls_data})
 
         # ===== ВРЕМЯ ОБНОВЛЕНИЯ =====
         update_time = f"🔄 Обновлено: {now.strftime('%d.%m.%Y %H:%M')}"
         updates.append({"range": "L1", "values": [[update_time]]})
 
-        # Отправка всех обновлений
-        logger.info(f"📤 Отправка {len(updates)} обновлений...")
-        worksheet.batch_update(updates, value_input_option="USER_ENTERED")
+        return updates
 
-    async def _apply_borders_and_formatting(
-        self, worksheet, all_totals: Dict, recalls_totals: Dict
-    ):
-        """
-        Применение границ всех ячеек + градиентное форматирование
+    @staticmethod
+    def _percent(part: int, whole: int) -> int:
+        """Целый процент part от whole (0, если whole == 0)"""
+        return int(part / whole * 100) if whole > 0 else 0
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _total_row_values(
+        sum_cols: Tuple[str, ...], first_row: int, last_row: int
+    ) -> Tuple:
         """
-        try:
-            sheet_id = worksheet.id
+        Значения строки ИТОГО одной таблицы: подпись и формулы SUM (10 колонок)
 
-            tubes_values = [v for v in all_totals.values() if v > 0]
-            recalls_values = [v for v in recalls_totals.values() if v > 0]
+        Зависят только от размеров таблицы, поэтому строятся один раз.
+        """
+        return (
+            None,
+            "ИТОГО:",
+            *(f"=SUM({col}{first_row}:{col}{last_row})" for col in sum_cols),
+            None,
+        )
 
-            if not tubes_values:
-                return
+    @staticmethod
+    def _total_row_request(sheet_id: int, total_row: int) -> Dict:
+        """
+        updateCells с серым жирным форматом строк ИТОГО обеих таблиц
 
-            min_tubes = min(tubes_values)
-            max_tubes = max(tubes_values)
+        Одна полоса A:U; пустая ячейка в K (разделитель) сбрасывает
+        лишь его формат, которого там нет.
+        """
+        return {
+            "updateCells": {
+                "range": {
+                    "sheetId": sheet_id,
+                    "startRowIndex": total_row - 1,
+                    "endRowIndex": total_row,
+                    "startColumnIndex": 0,
+                    "endColumnIndex": 21,
+                },
+                "rows": [
+                    {"values": [TOTAL_ROW_CELL] * 10 + [{}] + [TOTAL_ROW_CELL] * 10}
+                ],
+                "fields": FORMAT_FIELDS,
+            }
+        }
 
-            min_recalls = min(recalls_values) if recalls_values else 0
-            max_recalls = max(recalls_values) if recalls_values else 0
+    @staticmethod
+    def _format_signature(sheet_id: int, all_totals: Dict, recalls_totals: Dict) -> str:
+        """Подпись оформления: меняется только вместе с листом или итогами"""
+        return hashlib.blake2b(
+            repr(
+                (sheet_id, sorted(all_totals.items()), sorted(recalls_totals.items()))
+            ).encode(),
+            digest_size=16,
+        ).hexdigest()
+
+    def _prepare_formatting_requests(
+        self, sheet_id: int, all_totals: Dict, recalls_totals: Dict
+    ) -> List[Dict]:
+        """
+        Запросы границ всех ячеек, градиентов и формата строк ИТОГО
 
-            start_row = 4
-            data_start_row = 5
-            data_end_row = data_start_row + len(PAVLOGRAD_MANAGERS) - 1
-            total_row = data_end_row + 1
+        Чистая функция без обращений к API.
+        """
+        tubes_values = [v for v in all_totals.values() if v > 0]
+        recalls_values = [v for v in recalls_totals.values() if v > 0]
 
-            requests = []
+        min_tubes = min(tubes_values) if tubes_values else 0
+        max_tubes = max(tubes_values) if tubes_values else 0
 
-            # ===== ГРАНИЦЫ ТАБЛИЦЫ 1 (ВСЕ ТРУБКИ A4:J) =====
-            requests.append(
-                {
-                    "updateBorders": {
-                        "range": {
-                            "sheetId": sheet_id,
-                            "startRowIndex": start_row - 1,
-                            "endRowIndex": total_row,
-                            "startColumnIndex": 0,
-                            "endColumnIndex": 10,
-                        },
-                        "top": {"style": "SOLID", "width": 2},
-                        "bottom": {"style": "SOLID", "width": 2},
-                        "left": {"style": "SOLID", "width": 2},
-                        "right": {"style": "SOLID", "width": 2},
-                        "innerHorizontal": {"style": "SOLID", "width": 1},
-                        "innerVertical": {"style": "SOLID", "width": 1},
-                    }
-                }
-            )
+        min_recalls = min(recalls_values) if recalls_values else 0
+        max_recalls = max(recalls_values) if recalls_values else 0
 
-            # ===== ГРАНИЦЫ ТАБЛИЦЫ 2 (ПЕРЕЗВОНЫ L4:U) =====
-            requests.append(
-                {
-                    "updateBorders": {
-                        "range": {
-                            "sheetId": sheet_id,
-                            "startRowIndex": start_row - 1,
-                            "endRowIndex": total_row,
-                            "startColumnIndex": 11,
-                            "endColumnIndex": 21,
-                        },
-                        "top": {"style": "SOLID", "width": 2},
-                        "bottom": {"style": "SOLID", "width": 2},
-                        "left": {"style": "SOLID", "width": 2},
-                        "right": {"style": "SOLID", "width": 2},
-                        "innerHorizontal": {"style": "SOLID", "width": 1},
-                        "innerVertical": {"style": "SOLID", "width": 1},
-                    }
-                }
-            )
+        start_row = 4
+        data_start_row = 5
+        data_end_row = data_start_row + len(PAVLOGRAD_MANAGERS) - 1
+        total_row = data_end_row + 1
 
-            # ===== ГРАНИЦЫ ОБЩЕЙ СТАТИСТИКИ (W3:X7) =====
-            requests.append(
+        # ===== ГРАДИЕНТЫ =====
+        # Одна полоса строк на колонку ИТОГО: I (все трубки) и T (перезвоны).
+        # Пустая ячейка ({}) у менеджера без трубок сбрасывает его формат.
+        tubes_rows = [
+            {
+                "values": [
+                    self._gradient_cell(total, min_tubes, max_tubes)
+                    if total > 0
+                    else {}
+                ]
+            }
+            for total in (all_totals[name] for name in PAVLOGRAD_MANAGERS)
+        ]
+        recalls_rows = [
+            {
+                "values": [
+                    self._gradient_cell(total, min_recalls, max_recalls)
+                    if total > 0
+                    else {}
+                ]
+            }
+            for total in (recalls_totals[name] for name in PAVLOGRAD_MANAGERS)
+        ]
+
+        requests = [
+            # ===== ГРАНИЦЫ =====
+            # Таблица 1 (ВСЕ ТРУБКИ A4:J), таблица 2 (ПЕРЕЗВОНЫ L4:U),
+            # общая статистика (W3:X7)
+            self._borders_request(sheet_id, start_row - 1, total_row, 0, 10),
+            self._borders_request(sheet_id, start_row - 1, total_row, 11, 21),
+            self._borders_request(sheet_id, 2, 7, 22, 24),
+            *(
                 {
-                    "updateBorders": {
-                        "range": {
+                    "updateCells": {
+                        "start": {
                             "sheetId": sheet_id,
-                            "startRowIndex": 2,
-                            "endRowIndex": 7,
-                            "startColumnIndex": 22,
-                            "endColumnIndex": 24,
+                            "rowIndex": data_start_row - 1,
+                            "columnIndex": column,
                         },
-                        "top": {"style": "SOLID", "width": 2},
-                        "bottom": {"style": "SOLID", "width": 2},
-                        "left": {"style": "SOLID", "width": 2},
-                        "right": {"style": "SOLID", "width": 2},
-                        "innerHorizontal": {"style": "SOLID", "width": 1},
-                        "innerVertical": {"style": "SOLID", "width": 1},
+                        "rows": rows,
+                        "fields": FORMAT_FIELDS,
                     }
                 }
-            )
-
-            # ===== ГРАДИЕНТЫ =====
-            for idx, manager_name in enumerate(PAVLOGRAD_MANAGERS):
-                row_idx = data_start_row + idx
-
-                # Градиент для ИТОГО (все трубки) - колонка I
-                total = all_totals[manager_name]
-                if total > 0:
-                    color = self._calculate_gradient_color(total, min_tubes, max_tubes)
-                    requests.append(
-                        {
-                            "repeatCell": {
-                                "range": {
-                                    "sheetId": sheet_id,
-                                    "startRowIndex": row_idx - 1,
-                                    "endRowIndex": row_idx,
-                                    "startColumnIndex": 8,
-                                    "endColumnIndex": 9,
-                                },
-                                "cell": {
-                                    "userEnteredFormat": {
-                                        "backgroundColor": color,
-                                        "textFormat": {"bold": True},
-                                    }
-                                },
-                                "fields": "userEnteredFormat(backgroundColor,textFormat)",
-                            }
-                        }
-                    )
-
-                # Градиент для ИТОГО (перезвоны) - колонка T
-                total_recalls = recalls_totals[manager_name]
-                if total_recalls > 0 and recalls_values:
-                    color = self._calculate_gradient_color(
-                        total_recalls, min_recalls, max_recalls
-                    )
-                    requests.append(
-                        {
-                            "repeatCell": {
-                                "range": {
-                                    "sheetId": sheet_id,
-                                    "startRowIndex": row_idx - 1,
-                                    "endRowIndex": row_idx,
-                                    "startColumnIndex": 19,
-                                    "endColumnIndex": 20,
-                                },
-                                "cell": {
-                                    "userEnteredFormat": {
-                                        "backgroundColor": color,
-                                        "textFormat": {"bold": True},
-                                    }
-                                },
-                                "fields": "userEnteredFormat(backgroundColor,textFormat)",
-                            }
-                        }
-                    )
-
-            # Форматируем строки ИТОГО
-            for row_idx in [total_row, total_row]:
-                requests.append(
-                    {
-                        "repeatCell": {
-                            "range": {
-                                "sheetId": sheet_id,
-                                "startRowIndex": row_idx - 1,
-                                "endRowIndex": row_idx,
-                                "startColumnIndex": 0,
-                                "endColumnIndex": 10,
-                            },
-                            "cell": {
-                                "userEnteredFormat": {
-                                    "backgroundColor": {
-                                        "red": 0.9,
-                                        "green": 0.9,
-                                        "blue": 0.9,
-                                    },
-                                    "textFormat": {"bold": True},
-                                }
-                            },
-                            "fields": "userEnteredFormat(backgroundColor,textFormat)",
-                        }
-                    }
-                )
-
-                requests.append(
-                    {
-                        "repeatCell": {
-                            "range": {
-                                "sheetId": sheet_id,
-                                "startRowIndex": row_idx - 1,
-                                "endRowIndex": row_idx,
-                                "startColumnIndex": 11,
-                                "endColumnIndex": 21,
-                            },
-                            "cell": {
-                                "userEnteredFormat": {
-                                    "backgroundColor": {
-                                        "red": 0.9,
-                                        "green": 0.9,
-                                        "blue": 0.9,
-                                    },
-                                    "textFormat": {"bold": True},
-                                }
-                            },
-                            "fields": "userEnteredFormat(backgroundColor,textFormat)",
-                        }
-                    }
-                )
+                for column, rows in ((8, tubes_rows), (19, recalls_rows))
+            ),
+            # Строки ИТОГО: серый жирный формат (значения пишутся вместе с таблицами)
+            self._total_row_request(sheet_id, total_row),
+        ]
 
-            # Применяем все изменения
-            body = {"requests": requests}
-            self.spreadsheet.batch_update(body)
-
-            logger.info("✅ Границы и градиенты применены")
-
-        except Exception as e:
-            logger.error(f"❌ Ошибка применения границ: {e}")
+        return requests
 
     async def create_weekly_sheet_if_needed(self):
         """Создать новый лист для недели если наступил понедельник"""
@@ -1149,7 +1415,7 @@ class GoogleSheetsService:
                 logger.info("📅 Не понедельник - создание листа не требуется")
                 return
 
-            await self._create_weekly_sheet()
+            await self._create_weekly_sheet(now)
 
         except Exception as e:
             logger.error(f"❌ Ошибка создания еженедельного листа: {e}")
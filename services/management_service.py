@@ -13,16 +13,81 @@
 ✅ Batch операции (добавление нескольких менеджеров)
 ✅ Кэширование списков (опционально)
 """
+import asyncio
+import re
+from collections import Counter
 from typing import List, Dict, Optional, Tuple
 from telegram import Bot, error as telegram_error
 from database.models import db
 from config.settings import settings
 from utils.logger import logger
 
+ALREADY_MANAGER_MSG = "⚠️ Этот пользователь уже является менеджером."
+TELEPHONY_TYPES = frozenset({"white", "black"})
+TELEPHONY_TYPE_LABELS = {"white": ("⚪️", "Белая"), "black": ("⚫️", "Чёрная")}
+TELEPHONY_NAME_MAX_LEN = 50
+TELEPHONY_CODE_MAX_LEN = 20
+# Хотя бы одна буква или цифра: код только из '_' не принимается
+_TELEPHONY_CODE_RE = re.compile(
+    rf"(?=_*[A-Za-z0-9])[A-Za-z0-9_]{{1,{TELEPHONY_CODE_MAX_LEN}}}"
+)
+BROADCAST_CONCURRENCY = 25  # Одновременных отправок (лимит Telegram ~30 сообщений/с)
+
+
+# ===== ФОРМАТИРОВАНИЕ =====
+
+
+def _format_manager_item(index: int, manager: Tuple[int, str, str]) -> str:
+    """
+    Форматирование одного менеджера
+
+    Args:
+        index: Номер по порядку
+        manager: Кортеж (user_id, username, first_name) из db.get_manager_rows
+
+    Returns:
+        Отформатированная строка
+    """
+    user_id, username, first_name = manager
+    username = f"@{username}" if username else "без username"
+
+    return (
+        f"{index}. <b>{first_name or 'Неизвестно'}</b> ({username})\n"
+        f"   ID: <code>{user_id}</code>\n"
+    )
+
+
+def _format_telephony_item(index: int, tel: Tuple[str, str, str, int]) -> str:
+    """
+    Форматирование одной телефонии
+
+    Args:
+        index: Номер по порядку
+        tel: Кортеж (name, code, type, group_id) из db.get_telephony_rows
+
+    Returns:
+        Отформатированная строка
+    """
+    name, code, tel_type, group_id = tel
+    type_emoji, type_name = TELEPHONY_TYPE_LABELS.get(
+        tel_type, TELEPHONY_TYPE_LABELS["black"]
+    )
+
+    return (
+        f"{index}. {type_emoji} <b>{name}</b>\n"
+        f"   Код: <code>{code}</code>\n"
+        f"   Тип: {type_name}\n"
+        f"   Группа: <code>{group_id}</code>\n"
+    )
+
 
 class ManagementService:
     """Сервис для управления менеджерами, телефониями и рассылок"""
 
+    # Отрисованные списки: (версия данных в БД, текст)
+    _managers_list_cache: Optional[Tuple[Tuple[int, int], str]] = None
+    _telephonies_list_cache: Optional[Tuple[Tuple[int, int], str]] = None
+
     # ===== ВАЛИДАЦИЯ =====
 
     @staticmethod
@@ -92,71 +157,61 @@ class ManagementService:
         Returns:
             (is_valid, error_message)
         """
+        # Сначала дешёвые проверки, посимвольный разбор кода — последним
         if not name or not name.strip():
             return False, "❌ Название телефонии не может быть пустым"
 
-        if len(name) > 50:
-            return False, "❌ Название слишком длинное (максимум 50 символов)"
+        if len(name) > TELEPHONY_NAME_MAX_LEN:
+            return (
+                False,
+                f"❌ Название слишком длинное (максимум {TELEPHONY_NAME_MAX_LEN} символов)",
+            )
 
-        if not code or not code.strip():
-            return False, "❌ Код телефонии не может быть пустым"
+        if tel_type not in TELEPHONY_TYPES:
+            return False, "❌ Тип должен быть 'white' или 'black'"
 
-        if len(code) > 20:
-            return False, "❌ Код слишком длинный (максимум 20 символов)"
+        # Одно регулярное выражение проверяет пустоту, длину и символы кода;
+        # причину выясняем только для невалидного кода
+        if not _TELEPHONY_CODE_RE.fullmatch(code or ""):
+            if not code or not code.strip():
+                return False, "❌ Код телефонии не может быть пустым"
 
-        if not code.replace("_", "").isalnum():
-            return False, "❌ Код должен содержать только латинские буквы, цифры и '_'"
+            if len(code) > TELEPHONY_CODE_MAX_LEN:
+                return (
+                    False,
+                    f"❌ Код слишком длинный (максимум {TELEPHONY_CODE_MAX_LEN} символов)",
+                )
 
-        if tel_type not in ["white", "black"]:
-            return False, "❌ Тип должен быть 'white' или 'black'"
+            return False, "❌ Код должен содержать только латинские буквы, цифры и '_'"
 
         return True, None
 
-    # ===== ФОРМАТИРОВАНИЕ =====
+    # ===== МЕНЕДЖЕРЫ =====
 
     @staticmethod
-    def _format_manager_item(index: int, manager: Dict) -> str:
+    def _check_manager_candidate(user_id: int) -> Optional[str]:
         """
-        ✅ НОВОЕ: Форматирование одного менеджера
-
-        Args:
-            index: Номер по порядку
-            manager: Словарь с данными менеджера
+        Проверки перед добавлением менеджера, не требующие БД
 
         Returns:
-            Отформатированная строка
+            Сообщение об ошибке или None, если user_id подходит
         """
-        username = f"@{manager['username']}" if manager["username"] else "без username"
-        name = manager["first_name"] or "Неизвестно"
-
-        return (
-            f"{index}. <b>{name}</b> ({username})\n"
-            f"   ID: <code>{manager['user_id']}</code>\n"
-        )
-
-    @staticmethod
-    def _format_telephony_item(index: int, tel: Dict) -> str:
-        """
-        ✅ НОВОЕ: Форматирование одной телефонии
+        # ✅ НОВОЕ: Валидация user_id
+        is_valid, error_msg = ManagementService._validate_user_id(user_id)
+        if not is_valid:
+            logger.warning(f"⚠️ Попытка добавить менеджера с невалидным ID: {user_id}")
+            return error_msg
 
-        Args:
-            index: Номер по порядку
-            tel: Словарь с данными телефонии
+        # Проверка что не админ/пульт
+        if user_id in settings.ADMINS_SET:
+            logger.info(f"⚠️ Попытка добавить админа {user_id} как менеджера")
+            return "❌ Это администратор! Менеджером сделать нельзя."
 
-        Returns:
-            Отформатированная строка
-        """
-        type_emoji = "⚪️" if tel["type"] == "white" else "⚫️"
-        type_name = "Белая" if tel["type"] == "white" else "Чёрная"
-
-        return (
-            f"{index}. {type_emoji} <b>{tel['name']}</b>\n"
-            f"   Код: <code>{tel['code']}</code>\n"
-            f"   Тип: {type_name}\n"
-            f"   Группа: <code>{tel['group_id']}</code>\n"
-        )
+        if user_id in settings.PULT_SET:
+            logger.info(f"⚠️ Попытка добавить пульт {user_id} как менеджера")
+            return "❌ Это пульт! Менеджером сделать нельзя."
 
-    # ===== МЕНЕДЖЕРЫ =====
+        return None
 
     @staticmethod
     def add_manager(
@@ -179,25 +234,14 @@ class ManagementService:
         Returns:
             (success, message)
         """
-        # ✅ НОВОЕ: Валидация user_id
-        is_valid, error_msg = ManagementService._validate_user_id(user_id)
-        if not is_valid:
-            logger.warning(f"⚠️ Попытка добавить менеджера с невалидным ID: {user_id}")
+        error_msg = ManagementService._check_manager_candidate(user_id)
+        if error_msg:
             return False, error_msg
 
-        # Проверка что не админ/пульт
-        if user_id in settings.ADMINS:
-            logger.info(f"⚠️ Попытка добавить админа {user_id} как менеджера")
-            return False, "❌ Это администратор! Менеджером сделать нельзя."
-
-        if user_id in settings.PULT:
-            logger.info(f"⚠️ Попытка добавить пульт {user_id} как менеджера")
-            return False, "❌ Это пульт! Менеджером сделать нельзя."
-
         # Проверка что не добавлен уже
         if db.is_manager(user_id):
             logger.info(f"⚠️ Менеджер {user_id} уже существует")
-            return False, "⚠️ Этот пользователь уже является менеджером."
+            return False, ALREADY_MANAGER_MSG
 
         # Добавление
         success = db.add_manager(user_id, username, first_name, added_by)
@@ -231,20 +275,41 @@ class ManagementService:
         Returns:
             (success_count, failed_count, error_messages)
         """
-        success_count = 0
-        failed_count = 0
         errors = []
+        candidates = []
 
         for user_id in user_ids:
-            success, message = ManagementService.add_manager(
-                user_id, username=None, first_name=None, added_by=added_by
+            error_msg = ManagementService._check_manager_candidate(user_id)
+            if error_msg:
+                errors.append(f"ID {user_id}: {error_msg}")
+            else:
+                candidates.append(user_id)
+
+        # Один SELECT на всех вместо проверки каждого ID отдельно
+        existing = db.get_existing_manager_ids(candidates)
+        to_add = []
+        seen = set()
+        for user_id in candidates:
+            if user_id in existing or user_id in seen:
+                errors.append(f"ID {user_id}: {ALREADY_MANAGER_MSG}")
+            else:
+                seen.add(user_id)
+                to_add.append(user_id)
+
+        # Все новые менеджеры — одной транзакцией
+        added = db.add_managers_bulk(to_add, added_by)
+        if added < 0:
+            errors.extend(
+                f"ID {user_id}: ❌ Ошибка добавления менеджера в базу данных."
+                for user_id in to_add
             )
+            added = 0
+        elif added < len(to_add):
+            # Кто-то успел добавить часть ID между проверкой и вставкой
+            errors.append(f"⚠️ {len(to_add) - added} ID уже были добавлены ранее")
 
-            if success:
-                success_count += 1
-            else:
-                failed_count += 1
-                errors.append(f"ID {user_id}: {message}")
+        success_count = added
+        failed_count = len(user_ids) - success_count
 
         logger.info(
             f"📊 Batch добавление менеджеров: "
@@ -298,18 +363,29 @@ class ManagementService:
         Returns:
             Форматированная строка со списком
         """
-        managers = db.get_all_managers()
+        # Список не менялся с прошлого вызова — отдаём готовый текст.
+        # data_version ловит записи в обход Database (другие процессы)
+        version = (db.managers_version, db.data_version())
+        cached = ManagementService._managers_list_cache
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        managers = db.get_manager_rows()
 
         if not managers:
             return "📋 Список менеджеров пуст."
 
-        text = f"👥 <b>Менеджеры ({len(managers)}):</b>\n\n"
-
         # ✅ ИСПОЛЬЗУЕТ: Helper функцию для форматирования
-        for i, manager in enumerate(managers, 1):
-            text += ManagementService._format_manager_item(i, manager)
-            text += "\n"
+        text = (
+            f"👥 <b>Менеджеры ({len(managers)}):</b>\n\n"
+            + "\n".join(
+                _format_manager_item(i, manager)
+                for i, manager in enumerate(managers, 1)
+            )
+            + "\n"
+        )
 
+        ManagementService._managers_list_cache = (version, text)
         return text
 
     # ===== ТЕЛЕФОНИИ =====
@@ -356,8 +432,11 @@ class ManagementService:
             )
             return False, error_msg
 
+        # Коды хранятся в нижнем регистре
+        code = code.lower()
+
         # Добавление
-        success = db.add_telephony(name, code.lower(), tel_type, group_id, created_by)
+        success = db.add_telephony(name, code, tel_type, group_id, created_by)
 
         if success:
             # ✅ НОВОЕ: Логирование
@@ -374,7 +453,7 @@ class ManagementService:
             return True, (
                 f"✅ Телефония добавлена!\n\n"
                 f"📞 Название: <b>{name}</b>\n"
-                f"🔑 Код: <code>{code.lower()}</code>\n"
+                f"🔑 Код: <code>{code}</code>\n"
                 f"{type_emoji} Тип: {type_name}\n"
                 f"💬 Группа: <code>{group_id}</code>"
             )
@@ -425,32 +504,109 @@ class ManagementService:
         Returns:
             Форматированная строка со списком
         """
-        telephonies = db.get_all_telephonies()
+        # data_version ловит записи в обход Database (другие процессы)
+        version = (db.telephonies_version, db.data_version())
+        cached = ManagementService._telephonies_list_cache
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        telephonies = db.get_telephony_rows()
 
         if not telephonies:
             return "📋 Список телефоний пуст."
 
-        text = f"📞 <b>Телефонии ({len(telephonies)}):</b>\n\n"
-
         # ✅ ИСПОЛЬЗУЕТ: Helper функцию для форматирования
-        for i, tel in enumerate(telephonies, 1):
-            text += ManagementService._format_telephony_item(i, tel)
-            text += "\n"
+        text = (
+            f"📞 <b>Телефонии ({len(telephonies)}):</b>\n\n"
+            + "\n".join(
+                _format_telephony_item(i, tel) for i, tel in enumerate(telephonies, 1)
+            )
+            + "\n"
+        )
 
+        ManagementService._telephonies_list_cache = (version, text)
         return text
 
     # ===== РАССЫЛКА =====
 
+    @staticmethod
+    async def _send_broadcast_copy(
+        bot: Bot,
+        from_chat_id: int,
+        message_id: int,
+        user_id: int,
+        semaphore: asyncio.Semaphore,
+    ) -> Tuple[str, int]:
+        """
+        Копирует сообщение рассылки одному менеджеру
+
+        Returns:
+            (статус, user_id), статус: "success", "blocked" или "failed"
+        """
+        async with semaphore:
+            for attempt in range(2):
+                try:
+                    # Копируем сообщение менеджеру
+                    await bot.copy_message(
+                        chat_id=user_id,
+                        from_chat_id=from_chat_id,
+                        message_id=message_id,
+                    )
+                    logger.debug("✅ Рассылка отправлена user_id=%s", user_id)
+                    return "success", user_id
+
+                except telegram_error.RetryAfter as e:
+                    # Упёрлись в лимит Telegram: ждём и пробуем ещё раз
+                    if attempt:
+                        logger.error("❌ Лимит Telegram для user_id=%s: %s", user_id, e)
+                        return "failed", user_id
+                    await asyncio.sleep(e.retry_after)
+
+                except telegram_error.Forbidden:
+                    # ✅ НОВОЕ: Отдельная обработка для заблокировавших бота
+                    # (в лог попадают одной сводкой после рассылки)
+                    return "blocked", user_id
+
+                except Exception as e:
+                    # Любой сбой (в том числе сетевой вне TelegramError) считается
+                    # ошибкой одного получателя и не обрывает всю рассылку
+                    logger.error(
+                        "❌ Не удалось отправить рассылку user_id=%s: %s", user_id, e
+                    )
+                    return "failed", user_id
+
+        return "failed", user_id
+
     @staticmethod
     async def broadcast_message(bot: Bot, message, sent_by: int) -> Dict[str, int]:
         """
         Отправляет рассылку всем менеджерам
 
+        Args:
+            bot: Экземпляр бота
+            message: Сообщение для рассылки
+            sent_by: ID администратора
+
+        Returns:
+            Словарь со статистикой рассылки (см. broadcast_copy)
+        """
+        return await ManagementService.broadcast_copy(
+            bot, message.chat_id, message.message_id, sent_by
+        )
+
+    @staticmethod
+    async def broadcast_copy(
+        bot: Bot, from_chat_id: int, message_id: int, sent_by: int
+    ) -> Dict[str, int]:
+        """
+        Копирует сообщение всем менеджерам
+
         ✅ УЛУЧШЕНО: Подробное логирование + улучшенная статистика
 
         Args:
             bot: Экземпляр бота
-            message: Сообщение для рассылки
+            from_chat_id: Чат, где лежит сообщение рассылки
+            message_id: ID сообщения рассылки
             sent_by: ID администратора
 
         Returns:
@@ -461,33 +617,32 @@ class ManagementService:
 
         managers = db.get_all_managers()
 
+        # Отправляем параллельно, не больше BROADCAST_CONCURRENCY одновременно
+        semaphore = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+        results = await asyncio.gather(
+            *(
+                ManagementService._send_broadcast_copy(
+                    bot, from_chat_id, message_id, manager["user_id"], semaphore
+                )
+                for manager in managers
+            )
+        )
+
+        # ✅ НОВОЕ: Отдельный счётчик для заблокировавших бота (blocked)
+        statuses = Counter(status for status, _ in results)
         stats = {
             "total": len(managers),
-            "success": 0,
-            "failed": 0,
-            "blocked": 0,  # ✅ НОВОЕ: Отдельный счётчик для заблокировавших бота
-            "failed_ids": [],
+            "success": statuses["success"],
+            "failed": statuses["failed"],
+            "blocked": statuses["blocked"],
+            "failed_ids": [
+                user_id for status, user_id in results if status != "success"
+            ],
         }
 
-        for manager in managers:
-            user_id = manager["user_id"]
-
-            try:
-                # Копируем сообщение менеджеру
-                await message.copy(chat_id=user_id)
-                stats["success"] += 1
-                logger.debug(f"✅ Рассылка отправлена user_id={user_id}")
-
-            except telegram_error.Forbidden:
-                # ✅ НОВОЕ: Отдельная обработка для заблокировавших бота
-                stats["blocked"] += 1
-                stats["failed_ids"].append(user_id)
-                logger.warning(f"⚠️ Бот заблокирован пользователем user_id={user_id}")
-
-            except telegram_error.TelegramError as e:
-                stats["failed"] += 1
-                stats["failed_ids"].append(user_id)
-                logger.error(f"❌ Не удалось отправить рассылку user_id={user_id}: {e}")
+        blocked_ids = [user_id for status, user_id in results if status == "blocked"]
+        if blocked_ids:
+            logger.warning("⚠️ Бот заблокирован пользователями: %s", blocked_ids)
 
         # ✅ НОВОЕ: Подробное логирование результата
         logger.info(
@@ -7,22 +7,149 @@
 ✅ Передаёт дату в Apps Script в формате DD.MM
 ✅ Улучшена обработка ошибок
 """
-from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import datetime
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
 import aiohttp
+import orjson
+from tenacity import (
+    before_sleep_log,
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential,
+)
+from yarl import URL
 from config.settings import settings
+from utils.clock import now_kiev_hhmm
 from utils.logger import logger
 
+STATS_CACHE_SECONDS = 30  # Сколько живёт готовый дашборд менеджеров
+OFFLOAD_ROWS_THRESHOLD = 500  # С какого числа строк считать дашборд в потоке
+
+
+def _is_transient(error: BaseException) -> bool:
+    """Временный сбой Apps Script: 5xx, таймаут или обрыв соединения"""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= 500
+    return isinstance(error, (asyncio.TimeoutError, aiohttp.ClientConnectionError))
+
+
+# Повтор запроса к Apps Script: 3 попытки, пауза 0.2 с → 0.4 с
+FETCH_RETRY_CONFIG = {
+    "stop": stop_after_attempt(3),
+    "wait": wait_exponential(multiplier=0.2),
+    "retry": retry_if_exception(_is_transient),
+    "before_sleep": before_sleep_log(logger, logging.WARNING),
+    "reraise": True,
+}
+
+# Шаблон счётчиков по цветам (копируется для каждого менеджера)
+_COLOR_TEMPLATE = {"ЖЕЛТЫЙ": 0, "ЗЕЛЕНЫЙ": 0, "ФИОЛЕТОВЫЙ": 0}
+_ALLOWED_COLORS = frozenset(_COLOR_TEMPLATE)
+
+# Константы дашборда (не пересоздаются на каждый рендер)
+_COLOR_EMOJI = {"ЖЕЛТЫЙ": "🟨", "ЗЕЛЕНЫЙ": "🟩", "ФИОЛЕТОВЫЙ": "🟪"}
+_GREEN = _COLOR_EMOJI["ЗЕЛЕНЫЙ"]
+_YELLOW = _COLOR_EMOJI["ЖЕЛТЫЙ"]
+_PURPLE = _COLOR_EMOJI["ФИОЛЕТОВЫЙ"]
+_SEP = "━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+# Готовые полоски прогресса для 0..10 заполненных делений
+_BARS = tuple("█" * i + "░" * (10 - i) for i in range(11))
+
+# Оба поля строки одним C-вызовом
+_get_manager_color = itemgetter("менеджер", "цвет")
+
+
+def _manager_color_pairs(data: List[Dict]):
+    """Пары (менеджер, цвет) из строк с заполненным менеджером и известным цветом"""
+    for row in data:
+        try:
+            manager, color = _get_manager_color(row)
+        except KeyError:
+            continue
+        manager = manager.strip() if manager else ""
+        color = color.strip() if color else ""
+        if manager and color in _ALLOWED_COLORS:
+            yield manager, color
+
 
 class ManagersStatsService:
     """Сервис для получения статистики менеджеров Павлограда"""
 
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop = None
+        # Кэш дашборда: (время monotonic, текст) и общий запрос в полёте
+        self._stats_cache: Optional[Tuple[float, str]] = None
+        self._stats_inflight: Optional[asyncio.Future] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Общая HTTP-сессия к Apps Script (пул соединений, keep-alive)
+
+        Сессия привязана к event loop, поэтому пересоздаётся,
+        если вызов пришёл из другого loop.
+        """
+        loop = asyncio.get_running_loop()
+        if (
+            self._session is None
+            or self._session.closed
+            or self._session_loop is not loop
+        ):
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=15, sock_connect=5),
+                connector=aiohttp.TCPConnector(
+                    limit_per_host=10,
+                    keepalive_timeout=60,
+                    ttl_dns_cache=300,
+                    enable_cleanup_closed=True,
+                ),
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def close(self):
+        """Закрыть HTTP-сессию (при остановке бота)"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
     async def get_managers_stats(self) -> str:
-        """Получает статистику менеджеров за сегодня"""
+        """
+        Получает статистику менеджеров за сегодня
+
+        Готовый текст живёт STATS_CACHE_SECONDS; одновременные запросы
+        ждут один общий запрос к Apps Script вместо своих.
+        """
+        cached = self._stats_cache
+        if cached and time.monotonic() - cached[0] < STATS_CACHE_SECONDS:
+            return cached[1]
+
+        task = self._stats_inflight
+        if task is None or task.done():
+            task = self._stats_inflight = asyncio.ensure_future(
+                self._build_managers_stats()
+            )
+
+        try:
+            # shield: отмена одного ожидающего не отменяет общий запрос
+            return await asyncio.shield(task)
+        finally:
+            if self._stats_inflight is task and task.done():
+                self._stats_inflight = None
+
+    async def _build_managers_stats(self) -> str:
+        """Запросить данные и отрисовать дашборд (ошибки не кэшируются)"""
         try:
             data = await self._fetch_managers_data()
-            stats_by_manager = self._group_by_manager(data)
-            result = self._format_stats_dashboard(stats_by_manager)
+            result = await self._render_dashboard(data)
+            self._stats_cache = (time.monotonic(), result)
             return result
         except Exception as e:
             logger.error(
@@ -30,6 +157,21 @@ class ManagersStatsService:
             )
             return "⚠️ Ошибка получения статистики менеджеров"
 
+    async def _render_dashboard(self, data: List[Dict]) -> str:
+        """
+        Группировка и форматирование дашборда
+
+        Большие выгрузки обрабатываются в пуле потоков, чтобы не держать
+        event loop; маленькие - сразу, без накладных расходов на поток.
+        """
+        if len(data) > OFFLOAD_ROWS_THRESHOLD:
+            return await asyncio.to_thread(self._group_and_format, data)
+        return self._group_and_format(data)
+
+    def _group_and_format(self, data: List[Dict]) -> str:
+        """Синхронная часть: группировка по менеджерам и отрисовка"""
+        return self._format_stats_dashboard(self._group_by_manager(data))
+
     async def _fetch_managers_data(
         self, target_date: Optional[datetime] = None
     ) -> List[Dict]:
@@ -59,50 +201,43 @@ class ManagersStatsService:
             params["date"] = date_str
             logger.debug(f"📅 Запрос данных за дату: {date_str}")
 
-        # Добавляем параметры к URL
-        if "?" in url:
-            url += "&" + "&".join([f"{k}={v}" for k, v in params.items()])
-        else:
-            url += "?" + "&".join([f"{k}={v}" for k, v in params.items()])
+        # Добавляем параметры к URL (yarl кодирует их и не требует повторного разбора)
+        target = URL(url).update_query(params)
+        logger.debug(f"🔗 Запрос к Apps Script: {target}")
 
-        logger.debug(f"🔗 Запрос к Apps Script: {url}")
+        return await self._request_managers_data(target)
 
+    async def _request_managers_data(self, target: URL) -> List[Dict]:
+        """Запрос к Apps Script и разбор ответа"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    url, timeout=aiohttp.ClientTimeout(total=15)
-                ) as response:
-                    if response.status != 200:
-                        logger.error(f"❌ HTTP ошибка: {response.status}")
-                        raise Exception(f"HTTP {response.status}")
+            content_type, raw = await self._get_with_retry(target)
+            logger.debug(f"📄 Content-Type: {content_type}")
 
-                    content_type = response.headers.get("Content-Type", "")
-                    logger.debug(f"📄 Content-Type: {content_type}")
+            if content_type == "text/html":
+                html_text = raw.decode("utf-8", errors="replace")
+                logger.error("❌ Apps Script вернул HTML вместо JSON!")
+                logger.error("📄 Первые 500 символов:")
+                logger.error(html_text[:500])
 
-                    if "text/html" in content_type:
-                        html_text = await response.text()
-                        logger.error("❌ Apps Script вернул HTML вместо JSON!")
-                        logger.error("📄 Первые 500 символов:")
-                        logger.error(html_text[:500])
+                if "accounts.google.com" in html_text or "Sign in" in html_text:
+                    logger.error("🔒 Похоже на страницу входа Google!")
+                    logger.error("💡 Проверьте публикацию Apps Script")
 
-                        if "accounts.google.com" in html_text or "Sign in" in html_text:
-                            logger.error("🔒 Похоже на страницу входа Google!")
-                            logger.error("💡 Проверьте публикацию Apps Script")
+                raise ValueError("Apps Script вернул HTML вместо JSON")
 
-                        raise ValueError("Apps Script вернул HTML вместо JSON")
+            # orjson быстрее стандартного json, который использует response.json()
+            data = orjson.loads(raw)
 
-                    data = await response.json()
+            if isinstance(data, dict) and "error" in data:
+                logger.error(f"❌ Ошибка от скрипта: {data['error']}")
+                raise Exception(data["error"])
 
-                    if isinstance(data, dict) and "error" in data:
-                        logger.error(f"❌ Ошибка от скрипта: {data['error']}")
-                        raise Exception(data["error"])
+            if not isinstance(data, list):
+                logger.error(f"❌ Неожиданный формат данных: {type(data)}")
+                raise ValueError("Apps Script вернул не список")
 
-                    if not isinstance(data, list):
-                        logger.error(f"❌ Неожиданный формат данных: {type(data)}")
-                        raise ValueError("Apps Script вернул не список")
-
-                    logger.info(f"✅ Получено {len(data)} записей менеджеров")
-                    return data
+            logger.info(f"✅ Получено {len(data)} записей менеджеров")
+            return data
 
         except aiohttp.ClientError as e:
             logger.error(f"❌ Ошибка HTTP запроса: {e}", exc_info=True)
@@ -113,111 +248,119 @@ class ManagersStatsService:
             logger.error(f"❌ Ошибка получения данных: {e}", exc_info=True)
             raise
 
-    def _group_by_manager(self, data: List[Dict]) -> Dict[str, Dict[str, int]]:
-        """Группирует данные по менеджерам и цветам"""
-        stats = {}
+    @retry(**FETCH_RETRY_CONFIG)
+    async def _get_with_retry(self, target: URL) -> Tuple[str, bytes]:
+        """
+        GET к Apps Script с повтором при временных сбоях
 
-        for row in data:
-            manager = row.get("менеджер", "").strip()
-            color = row.get("цвет", "").strip()
+        Повторяются только 5xx, таймауты и обрывы соединения;
+        4xx и прочие ошибки пробрасываются сразу.
 
-            if not manager or not color:
-                continue
+        Returns:
+            (MIME-тип ответа, тело ответа)
+        """
+        session = await self._get_session()
+        async with session.get(target) as response:
+            if response.status != 200:
+                logger.error(f"❌ HTTP ошибка: {response.status}")
+                if response.status >= 500:
+                    response.raise_for_status()
+                raise Exception(f"HTTP {response.status}")
 
-            if manager not in stats:
-                stats[manager] = {"ЖЕЛТЫЙ": 0, "ЗЕЛЕНЫЙ": 0, "ФИОЛЕТОВЫЙ": 0}
+            # aiohttp уже разобрал заголовок: только MIME-тип без параметров
+            return response.content_type, await response.read()
 
-            if color in stats[manager]:
-                stats[manager][color] += 1
+    def _group_by_manager(self, data: List[Dict]) -> Dict[str, Dict[str, int]]:
+        """
+        Группирует данные по менеджерам и цветам
+
+        Строки с неизвестным цветом не учитываются: менеджер без единой
+        трубки известного цвета в дашборд (и в число менеджеров) не попадает.
+        """
+        # Сначала считаем пары (менеджер, цвет) одним проходом
+        pairs = Counter(_manager_color_pairs(data))
+
+        stats = {}
+        for (manager, color), count in pairs.items():
+            counters = stats.get(manager)
+            if counters is None:
+                counters = stats[manager] = _COLOR_TEMPLATE.copy()
+            counters[color] = count
 
         return stats
 
     def _format_stats_dashboard(self, stats: Dict[str, Dict[str, int]]) -> str:
         """Форматирует статистику в стиле дашборда"""
-        kiev_tz = timezone(timedelta(hours=2))
-        current_time = datetime.now(kiev_tz).strftime("%H:%M")
-
-        COLOR_EMOJI = {"ЖЕЛТЫЙ": "🟨", "ЗЕЛЕНЫЙ": "🟩", "ФИОЛЕТОВЫЙ": "🟪"}
+        current_time = now_kiev_hhmm()
 
         if not stats:
             return f"👥 <b>МЕНЕДЖЕРЫ (ПАВЛОГРАД) на {current_time}</b>\n\n📭 Данных нет."
 
-        # Сортируем по общему количеству
-        sorted_managers = sorted(
-            stats.items(), key=lambda x: sum(x[1].values()), reverse=True
-        )
-
-        total_calls = sum(sum(colors.values()) for colors in stats.values())
-
-        result = f"👥 <b>МЕНЕДЖЕРЫ (ПАВЛОГРАД) на {current_time}</b>\n"
-        result += "━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-
-        result += "📊 <b>ОБЩЕЕ:</b>\n"
-        result += f"• Всего трубок: <b>{total_calls}</b>\n"
-        result += f"• Менеджеров: {len(stats)}\n\n"
-
-        result += "━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-
-        for i, (manager, colors) in enumerate(sorted_managers, 1):
-            total = sum(colors.values())
-
-            if total == 0:
-                continue
-
+        # Один проход: итоги по каждому менеджеру и по цветам
+        rows = []
+        total_green = total_yellow = total_purple = 0
+        for manager, colors in stats.items():
             green = colors["ЗЕЛЕНЫЙ"]
             yellow = colors["ЖЕЛТЫЙ"]
             purple = colors["ФИОЛЕТОВЫЙ"]
+            total_green += green
+            total_yellow += yellow
+            total_purple += purple
+            # В stats только менеджеры с трубками известных цветов
+            rows.append((manager, green, yellow, purple, green + yellow + purple))
 
-            percentage = int((total / total_calls) * 100) if total_calls > 0 else 0
-            filled = int(percentage / 10) if percentage <= 100 else 10
-            bar = "█" * filled + "░" * (10 - filled)
-
-            result += f"<b>{i}. {manager}</b> - {total} трубок\n"
-            result += f"{bar} {percentage}%\n"
+        total_calls = total_green + total_yellow + total_purple
 
-            colors_line = []
+        # Сортируем по общему количеству
+        rows.sort(key=itemgetter(4), reverse=True)
+
+        parts = [
+            f"👥 <b>МЕНЕДЖЕРЫ (ПАВЛОГРАД) на {current_time}</b>\n",
+            _SEP,
+            "📊 <b>ОБЩЕЕ:</b>\n",
+            f"• Всего трубок: <b>{total_calls}</b>\n",
+            f"• Менеджеров: {len(stats)}\n\n",
+            _SEP,
+        ]
+
+        for i, (manager, green, yellow, purple, total) in enumerate(rows, 1):
+            percentage = total * 100 // total_calls if total_calls > 0 else 0
+            bar = _BARS[percentage // 10 if percentage <= 100 else 10]
+
+            # Строка цветов: "• A | B | C" только из ненулевых
+            cells = []
             if green > 0:
-                green_pct = int((green / total) * 100)
-                colors_line.append(f"{COLOR_EMOJI['ЗЕЛЕНЫЙ']} {green} ({green_pct}%)")
+                cells.append(f"{_GREEN} {green} ({green * 100 // total}%)")
             if yellow > 0:
-                yellow_pct = int((yellow / total) * 100)
-                colors_line.append(f"{COLOR_EMOJI['ЖЕЛТЫЙ']} {yellow} ({yellow_pct}%)")
+                cells.append(f"{_YELLOW} {yellow} ({yellow * 100 // total}%)")
             if purple > 0:
-                purple_pct = int((purple / total) * 100)
-                colors_line.append(
-                    f"{COLOR_EMOJI['ФИОЛЕТОВЫЙ']} {purple} ({purple_pct}%)"
-                )
-
-            if colors_line:
-                result += "• " + " | ".join(colors_line) + "\n"
-
-            result += "\n"
-
-        result += "━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+                cells.append(f"{_PURPLE} {purple} ({purple * 100 // total}%)")
+            color_line = f"• {' | '.join(cells)}\n" if cells else ""
+
+            # Блок менеджера собирается одной f-строкой
+            parts.append(
+                f"<b>{i}. {manager}</b> - {total} трубок\n"
+                f"{bar} {percentage}%\n"
+                f"{color_line}\n"
+            )
 
-        total_green = sum(m["ЗЕЛЕНЫЙ"] for m in stats.values())
-        total_yellow = sum(m["ЖЕЛТЫЙ"] for m in stats.values())
-        total_purple = sum(m["ФИОЛЕТОВЫЙ"] for m in stats.values())
+        parts.append(_SEP)
 
-        result += "🎨 <b>ИТОГО ПО ЦВЕТАМ:</b>\n"
+        parts.append("🎨 <b>ИТОГО ПО ЦВЕТАМ:</b>\n")
 
         if total_green > 0:
-            green_pct = int((total_green / total_calls) * 100)
-            result += (
-                f"{COLOR_EMOJI['ЗЕЛЕНЫЙ']} Зелёные: {total_green} ({green_pct}%)\n"
-            )
+            green_pct = total_green * 100 // total_calls
+            parts.append(f"{_GREEN} Зелёные: {total_green} ({green_pct}%)\n")
 
         if total_yellow > 0:
-            yellow_pct = int((total_yellow / total_calls) * 100)
-            result += (
-                f"{COLOR_EMOJI['ЖЕЛТЫЙ']} Жёлтые: {total_yellow} ({yellow_pct}%)\n"
-            )
+            yellow_pct = total_yellow * 100 // total_calls
+            parts.append(f"{_YELLOW} Жёлтые: {total_yellow} ({yellow_pct}%)\n")
 
         if total_purple > 0:
-            purple_pct = int((total_purple / total_calls) * 100)
-            result += f"{COLOR_EMOJI['ФИОЛЕТОВЫЙ']} Фиолетовые: {total_purple} ({purple_pct}%)\n"
+            purple_pct = total_purple * 100 // total_calls
+            parts.append(f"{_PURPLE} Фиолетовые: {total_purple} ({purple_pct}%)\n")
 
-        return result
+        return "".join(parts)
 
 
 # Глобальный экземпляр сервиса
@@ -13,6 +13,19 @@ from utils.logger import logger
 from config.validators import InputValidator
 from config.constants import QUICK_ERRORS
 
+# Допустимые коды быстрых ошибок и их список для сообщения об ошибке
+_VALID_CODES = frozenset(QUICK_ERRORS) | {"custom"}
+_CODES_STR = ", ".join(QUICK_ERRORS) + ", custom"
+
+# Шаблон сообщения о быстрой ошибке для группы
+_QUICK_ERROR_TEMPLATE = (
+    "⚡️ <b>БЫСТРАЯ ОШИБКА - {tel_name_upper}</b>\n"
+    "━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+    "📞 <b>Телефония:</b> {tel_name} ({tel_code})\n"
+    "🔢 <b>SIP:</b> {sip}\n"
+    "❌ <b>Ошибка:</b> {error_code}. {error_name}\n"
+)
+
 
 class QuickErrorService:
     """Сервис для управления быстрыми ошибками"""
@@ -69,25 +82,21 @@ class QuickErrorService:
             return False, error
 
         try:
-            conn = db._get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute(
-                """
-                INSERT OR IGNORE INTO quick_error_telephonies (tel_code)
-                VALUES (?)
-            """,
-                (tel_code,),
-            )
+            with db.connection() as conn:
+                cursor = conn.execute(
+                    """
+                    INSERT OR IGNORE INTO quick_error_telephonies (telephony_code)
+                    VALUES (?)
+                """,
+                    (tel_code,),
+                )
 
             if cursor.rowcount == 0:
-                conn.close()
                 msg = f"⚠️ Телефония {tel_code} уже добавлена к быстрым ошибкам"
                 logger.warning(msg)
                 return False, msg
 
-            conn.commit()
-            conn.close()
+            db.invalidate_quick_error_cache()
 
             msg = f"✅ Телефония {tel['name']} ({tel_code}) добавлена к быстрым ошибкам"
             logger.info(msg)
@@ -97,6 +106,56 @@ class QuickErrorService:
             logger.error(f"❌ Ошибка добавления быстрой ошибки: {e}")
             return False, f"❌ Ошибка базы данных: {str(e)}"
 
+    @staticmethod
+    def bulk_add_quick_error_telephonies(codes: List[str]) -> Tuple[int, List[str]]:
+        """
+        Пакетно добавляет телефонии к быстрым ошибкам
+
+        Все коды проверяются по одной выгрузке типов телефоний,
+        подходящие добавляются одной транзакцией.
+
+        Args:
+            codes: Коды телефоний
+
+        Returns:
+            (added_count, error_messages)
+        """
+        errors = []
+        candidates = []
+
+        for code in codes:
+            is_valid, error = InputValidator.validate_telephony_code(code)
+            if is_valid:
+                candidates.append(code.strip().lower())
+            else:
+                errors.append(error)
+
+        # Один запрос на все коды вместо get_telephony_by_code для каждого
+        types = db.get_telephony_types()
+        to_add = []
+        seen = set()
+        for code in candidates:
+            tel_type = types.get(code)
+            if tel_type is None:
+                errors.append(f"❌ Телефония {code} не найдена в БД")
+            elif tel_type != "white":
+                errors.append(f"❌ Телефония {code} не белая (тип: {tel_type})")
+            elif code not in seen:
+                seen.add(code)
+                to_add.append(code)
+
+        added = db.add_quick_error_telephonies_bulk(to_add)
+        if added < 0:
+            errors.append("❌ Ошибка базы данных при добавлении")
+            added = 0
+        elif added < len(to_add):
+            errors.append(
+                f"⚠️ {len(to_add) - added} телефоний уже были в быстрых ошибках"
+            )
+
+        logger.info(f"📊 Пакетное добавление быстрых ошибок: {added} из {len(codes)}")
+        return added, errors
+
     @staticmethod
     def remove_quick_error_telephony(tel_code: str) -> Tuple[bool, Optional[str]]:
         """
@@ -115,25 +174,21 @@ class QuickErrorService:
             return False, error
 
         try:
-            conn = db._get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute(
-                """
-                DELETE FROM quick_error_telephonies
-                WHERE tel_code = ?
-            """,
-                (tel_code,),
-            )
+            with db.connection() as conn:
+                cursor = conn.execute(
+                    """
+                    DELETE FROM quick_error_telephonies
+                    WHERE telephony_code = ?
+                """,
+                    (tel_code,),
+                )
 
             if cursor.rowcount == 0:
-                conn.close()
                 msg = f"⚠️ Телефония {tel_code} не найдена в быстрых ошибках"
                 logger.warning(msg)
                 return False, msg
 
-            conn.commit()
-            conn.close()
+            db.invalidate_quick_error_cache()
 
             msg = f"✅ Телефония {tel_code} удалена из быстрых ошибок"
             logger.info(msg)
@@ -152,23 +207,18 @@ class QuickErrorService:
             List со данными телефоний
         """
         try:
-            conn = db._get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute(
+            with db.connection() as conn:
+                cursor = conn.execute(
+                    """
+                    SELECT t.id, t.name, t.code, t.type, q.added_at
+                    FROM quick_error_telephonies q
+                    JOIN telephonies t ON q.telephony_code = t.code
+                    ORDER BY q.added_at DESC
                 """
-                SELECT t.id, t.name, t.code, t.type, q.added_at
-                FROM quick_error_telephonies q
-                JOIN telephonies t ON q.tel_code = t.code
-                ORDER BY q.added_at DESC
-            """
-            )
-
-            columns = [desc[0] for desc in cursor.description]
-            rows = cursor.fetchall()
-            conn.close()
+                )
+                rows = cursor.fetchall()
 
-            return [dict(zip(columns, row)) for row in rows]
+            return [dict(row) for row in rows]
 
         except Exception as e:
             logger.error(f"❌ Ошибка получения телефоний быстрых ошибок: {e}")
@@ -177,7 +227,7 @@ class QuickErrorService:
     @staticmethod
     def is_quick_error_enabled(tel_code: str) -> bool:
         """
-        Проверяет, включены ли быстрые ошибки для телефонии
+        Проверяет, включены ли быстрые ошибки для телефонии (по кэшу в памяти)
 
         Args:
             tel_code: Код телефонии
@@ -203,11 +253,10 @@ class QuickErrorService:
 
         code = code.strip()
 
-        if code not in QUICK_ERRORS and code != "custom":
-            codes_list = ", ".join(QUICK_ERRORS.keys())
+        if code not in _VALID_CODES:
             return (
                 False,
-                f"❌ Неизвестный код ошибки '{code}'. Допустимые: {codes_list}, custom",
+                f"❌ Неизвестный код ошибки '{code}'. Допустимые: {_CODES_STR}",
             )
 
         return True, None
@@ -242,11 +291,13 @@ class QuickErrorService:
         Returns:
             Форматированное сообщение
         """
-        message = (
-            f"⚡️ <b>БЫСТРАЯ ОШИБКА - {tel_name.upper()}</b>\n"
-            f"━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-            f"📞 <b>Телефония:</b> {tel_name} ({tel_code})\n"
-            f"🔢 <b>SIP:</b> {sip}\n"
-            f"❌ <b>Ошибка:</b> {error_code}. {error_name}\n"
+        return _QUICK_ERROR_TEMPLATE.format_map(
+            {
+                "tel_name_upper": tel_name.upper(),
+                "tel_name": tel_name,
+                "tel_code": tel_code,
+                "sip": sip,
+                "error_code": error_code,
+                "error_name": error_name,
+            }
         )
-        return message
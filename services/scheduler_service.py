@@ -4,12 +4,15 @@ services/scheduler_service.py
 ✅ ИЗМЕНЕНИЕ: убрана задача обновления статистики баз (теперь только по запросу через кнопку)
 """
 import asyncio
+import threading
 from datetime import datetime
 import pytz
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from telegram import Bot
 from config.settings import settings
+from database.models import db
+from services.google_sheets_service import google_sheets_service
 
 from utils.logger import logger
 from utils.notifications import notification_service
@@ -28,34 +31,64 @@ class SchedulerService:
         self._error_count = 0
         self._consecutive_errors = 0
         self._bot = None
+        # Постоянный event loop в фоновом потоке для асинхронных задач
+        self._loop = None
+        self._loop_thread = None
+        self._loop_lock = threading.Lock()
 
     def set_bot(self, bot: Bot):
         """Установить экземпляр бота для отправки уведомлений"""
         self._bot = bot
         logger.info("✅ Бот установлен для отправки уведомлений")
 
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Постоянный event loop задач (создаётся при первом использовании)"""
+        with self._loop_lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="scheduler-loop",
+                    daemon=True,
+                )
+                self._loop_thread.start()
+            return self._loop
+
     def _run_async_task(self, coro):
         """Запустить асинхронную задачу в синхронном контексте"""
-        loop = None
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(coro)
+            return asyncio.run_coroutine_threadsafe(coro, self._get_loop()).result()
         except Exception as e:
             logger.error(f"❌ Ошибка выполнения задачи: {e}")
             raise
-        finally:
-            if loop is not None:
-                try:
-                    loop.close()
-                except Exception as e:
-                    logger.error(f"⚠️ Ошибка закрытия event loop: {e}")
+
+    def _stop_loop(self):
+        """Закрыть HTTP-сессии и остановить постоянный event loop"""
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = self._loop_thread = None
+
+        if loop is None or loop.is_closed():
+            return
+
+        try:
+            # HTTP-сессия сервиса привязана к этому loop
+            asyncio.run_coroutine_threadsafe(
+                google_sheets_service.close(), loop
+            ).result(timeout=10)
+        except Exception as e:
+            logger.error(f"⚠️ Ошибка закрытия HTTP-сессии: {e}")
+
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=10)
+        try:
+            loop.close()
+        except Exception as e:
+            logger.error(f"⚠️ Ошибка закрытия event loop: {e}")
 
     def _update_stats_job(self):
         """Задача обновления статистики менеджеров"""
         try:
-            from services.google_sheets_service import google_sheets_service
-
             now = datetime.now(self.timezone)
             logger.info(
                 f"⏰ Запуск обновления статистики менеджеров ({now.strftime('%H:%M')})"
@@ -64,7 +97,7 @@ class SchedulerService:
             if (
                 not google_sheets_service.client
                 or not google_sheets_service.spreadsheet
-            ):
+            ) and not google_sheets_service.refresh_auth():
                 logger.error("❌ Google Sheets сервис не инициализирован!")
                 self._error_count += 1
                 self._consecutive_errors += 1
@@ -119,8 +152,6 @@ class SchedulerService:
     def _create_weekly_sheet_job(self):
         """Задача создания нового листа"""
         try:
-            from services.google_sheets_service import google_sheets_service
-
             now = datetime.now(self.timezone)
             logger.info(
                 f"⏰ Запуск создания листа новой недели ({now.strftime('%Y-%m-%d %H:%M')})"
@@ -129,7 +160,7 @@ class SchedulerService:
             if (
                 not google_sheets_service.client
                 or not google_sheets_service.spreadsheet
-            ):
+            ) and not google_sheets_service.refresh_auth():
                 logger.error("❌ Google Sheets сервис не инициализирован!")
 
                 if self._bot:
@@ -152,8 +183,6 @@ class SchedulerService:
     def _reset_sips_job(self):
         """Задача сброса SIP (каждое утро в 8:00)"""
         try:
-            from database.models import db
-
             now = datetime.now(self.timezone)
             logger.info(f"⏰ Запуск сброса SIP ({now.strftime('%Y-%m-%d %H:%M')})")
 
@@ -170,58 +199,41 @@ class SchedulerService:
             if self._bot:
                 self._send_critical_notification("Сброс SIP менеджеров", str(e))
 
+    @staticmethod
+    async def _notify(send, **kwargs):
+        """
+        Отправить уведомление отдельным ботом планировщика
+
+        async with закрывает HTTP-клиент бота после отправки,
+        иначе он остаётся открытым в постоянном loop.
+        """
+        async with Bot(token=settings.BOT_TOKEN) as local_bot:
+            await send(bot=local_bot, **kwargs)
+
     def _send_critical_notification(
         self, error_type: str, error_msg: str, additional_info: str = None
     ):
         """Отправить критическое уведомление админу"""
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-            local_bot = Bot(token=settings.BOT_TOKEN)
-
-            loop.run_until_complete(
-                notification_service.notify_critical_error(
-                    bot=local_bot,
+            self._run_async_task(
+                self._notify(
+                    notification_service.notify_critical_error,
                     error_type=error_type,
                     details=error_msg,
                     additional_info=additional_info,
                 )
             )
-
-            try:
-                session = getattr(local_bot, "session", None)
-                if session is not None:
-                    loop.run_until_complete(session.aclose())
-            except Exception:
-                pass
-
-            loop.close()
         except Exception as e:
             logger.error(f"❌ Не удалось отправить уведомление: {e}")
 
     def _send_recovery_notification(self, service_name: str):
         """Отправить уведомление о восстановлении"""
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-            local_bot = Bot(token=settings.BOT_TOKEN)
-
-            loop.run_until_complete(
-                notification_service.notify_recovery(
-                    bot=local_bot, service_name=service_name
+            self._run_async_task(
+                self._notify(
+                    notification_service.notify_recovery, service_name=service_name
                 )
             )
-
-            try:
-                session = getattr(local_bot, "session", None)
-                if session is not None:
-                    loop.run_until_complete(session.aclose())
-            except Exception:
-                pass
-
-            loop.close()
         except Exception as e:
             logger.error(f"❌ Не удалось отправить уведомление о восстановлении: {e}")
 
@@ -329,6 +341,9 @@ class SchedulerService:
                         logger.info(
                             f"  ⏰ Последнее обновление: {self._last_update_success.strftime('%Y-%m-%d %H:%M')}"
                         )
+
+            # Loop мог использоваться и без запуска планировщика (run_update_now)
+            self._stop_loop()
         except Exception as e:
             logger.error(f"❌ Ошибка остановки планировщика: {e}")
 
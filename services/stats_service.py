@@ -1,12 +1,16 @@
 """
 Сервис для работы со статистикой из Google Sheets через Apps Script
 """
-from datetime import datetime, timezone, timedelta
+from collections import Counter
 from typing import Dict, List
 import aiohttp
 from config.settings import settings
+from utils.clock import now_kiev_hhmm
 from utils.logger import logger
 
+# Шаблон счётчиков по цветам (копируется для каждого города)
+_COLOR_TEMPLATE = {"ЖЕЛТЫЙ": 0, "ЗЕЛЕНЫЙ": 0, "ФИОЛЕТОВЫЙ": 0}
+
 
 class StatsService:
     """Сервис для получения статистики перезвонов из Google Sheets"""
@@ -83,21 +87,23 @@ class StatsService:
         Returns:
             Словарь {город: {цвет: количество}}
         """
-        stats = {}
-
-        for row in data:
-            city = row.get("город", "").strip()
-            color = row.get("цвет", "").strip()
-
-            if not city or not color:
-                continue
-
-            # Нормализуем название города
-            if city not in stats:
-                stats[city] = {"ЖЕЛТЫЙ": 0, "ЗЕЛЕНЫЙ": 0, "ФИОЛЕТОВЫЙ": 0}
+        # Сначала считаем пары (город, цвет) одним проходом
+        pairs = Counter(
+            (city, color)
+            for city, color in (
+                (row.get("город", "").strip(), row.get("цвет", "").strip())
+                for row in data
+            )
+            if city and color
+        )
 
-            if color in stats[city]:
-                stats[city][color] += 1
+        stats = {}
+        for (city, color), count in pairs.items():
+            counters = stats.get(city)
+            if counters is None:
+                counters = stats[city] = _COLOR_TEMPLATE.copy()
+            if color in counters:
+                counters[color] += count
 
         return stats
 
@@ -112,8 +118,7 @@ class StatsService:
             Форматированная строка
         """
         # Киевское время (UTC+2 зимой)
-        kiev_tz = timezone(timedelta(hours=2))
-        current_time = datetime.now(kiev_tz).strftime("%H:%M")
+        current_time = now_kiev_hhmm()
 
         # Эмодзи для цветов
         COLOR_EMOJI = {"ЖЕЛТЫЙ": "🟨", "ЗЕЛЕНЫЙ": "🟩", "ФИОЛЕТОВЫЙ": "🟪"}
@@ -138,9 +143,9 @@ class StatsService:
             yellow = city_stats["ЖЕЛТЫЙ"]
             purple = city_stats["ФИОЛЕТОВЫЙ"]
 
-            green_pct = int((green / total) * 100) if total > 0 else 0
-            yellow_pct = int((yellow / total) * 100) if total > 0 else 0
-            purple_pct = int((purple / total) * 100) if total > 0 else 0
+            green_pct = green * 100 // total if total > 0 else 0
+            yellow_pct = yellow * 100 // total if total > 0 else 0
+            purple_pct = purple * 100 // total if total > 0 else 0
 
             result += f"<b>{city}:</b> {total}\n"
 
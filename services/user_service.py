@@ -33,12 +33,12 @@ class UserService:
             True если доступ разрешён
         """
         # 1. Проверяем админов (всегда из .env)
-        if user_id in settings.ADMINS:
+        if user_id in settings.ADMINS_SET:
             logger.debug(f"✅ Доступ: {user_id} - админ (.env)")
             return True
 
         # 2. Проверяем пульт (всегда из .env)
-        if user_id in settings.PULT:
+        if user_id in settings.PULT_SET:
             logger.debug(f"✅ Доступ: {user_id} - пульт (.env)")
             return True
 
@@ -61,7 +61,7 @@ class UserService:
         Returns:
             True если пользователь админ
         """
-        return user_id in settings.ADMINS
+        return user_id in settings.ADMINS_SET
 
     @staticmethod
     def is_pult(user_id: int) -> bool:
@@ -74,7 +74,7 @@ class UserService:
         Returns:
             True если пользователь пульт
         """
-        return user_id in settings.PULT
+        return user_id in settings.PULT_SET
 
     @staticmethod
     def is_manager(user_id: int) -> bool:
@@ -90,7 +90,7 @@ class UserService:
             True если пользователь менеджер
         """
         # Админы и пульт НЕ являются менеджерами
-        if user_id in settings.ADMINS or user_id in settings.PULT:
+        if user_id in settings.ADMINS_SET or user_id in settings.PULT_SET:
             return False
 
         return db.is_manager(user_id)
@@ -106,10 +106,10 @@ class UserService:
         Returns:
             "admin_env", "pult_env", "manager_db" или "none"
         """
-        if user_id in settings.ADMINS:
+        if user_id in settings.ADMINS_SET:
             return "admin_env"
 
-        if user_id in settings.PULT:
+        if user_id in settings.PULT_SET:
             return "pult_env"
 
         if db.is_manager(user_id):
@@ -152,7 +152,7 @@ class UserService:
 
         for user_id in managers_from_env:
             # Пропускаем админов и пульт
-            if user_id in settings.ADMINS or user_id in settings.PULT:
+            if user_id in settings.ADMINS_SET or user_id in settings.PULT_SET:
                 continue
 
             # Проверяем есть ли уже в БД
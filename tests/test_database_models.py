@@ -0,0 +1,122 @@
+"""
+tests/test_database_models.py
+Unit тесты пакетных операций database.models (временный файл SQLite)
+Запуск: pytest tests/test_database_models.py -v
+"""
+import pytest
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Чистая БД во временном каталоге"""
+    from database.models import Database
+
+    return Database(str(tmp_path / "test.db"))
+
+
+def _trace_pooled(database) -> list:
+    """SQL, выполненный через долгоживущее соединение потока"""
+    statements = []
+    with database.connection() as conn:
+        conn.set_trace_callback(statements.append)
+    return statements
+
+
+def _add_white_telephonies(database, *codes):
+    for i, code in enumerate(codes):
+        assert database.add_telephony(f"Tel {code}", code, "white", group_id=-100 - i)
+
+
+# ===================================================================
+# Менеджеры: пакетное добавление и проверка существующих
+# ===================================================================
+
+class TestManagersBulk:
+    """add_managers_bulk и get_existing_manager_ids"""
+
+    def test_add_counts_inserted_and_skips_existing(self, database):
+        assert database.add_manager(1)
+        version = database.managers_version
+
+        added = database.add_managers_bulk([1, 2, 3, 3], added_by=99)
+
+        assert added == 2
+        assert database.managers_version > version
+        assert database.get_existing_manager_ids([1, 2, 3, 4]) == {1, 2, 3}
+
+    def test_add_empty_list(self, database):
+        version = database.managers_version
+
+        assert database.add_managers_bulk([]) == 0
+        assert database.managers_version == version
+
+    def test_existing_ids_queried_in_chunks(self, database, monkeypatch):
+        from database import models
+
+        ids = list(range(1, 1201))
+        assert database.add_managers_bulk(ids) == 1200
+
+        queries = []
+        real_connect = database._get_connection
+
+        def traced_connection():
+            conn = real_connect()
+            conn.set_trace_callback(queries.append)
+            return conn
+
+        monkeypatch.setattr(database, "_get_connection", traced_connection)
+
+        existing = database.get_existing_manager_ids(ids + [5000])
+
+        assert existing == set(ids)
+        # 1201 id при SQL_IN_CHUNK_SIZE = 500 → три запроса IN (...)
+        selects = [q for q in queries if q.startswith("SELECT user_id FROM managers")]
+        assert len(selects) == -(-1201 // models.SQL_IN_CHUNK_SIZE) == 3
+
+    def test_existing_ids_empty_list(self, database):
+        assert database.get_existing_manager_ids([]) == set()
+
+
+# ===================================================================
+# Быстрые ошибки: пакетное добавление
+# ===================================================================
+
+class TestQuickErrorBulk:
+    """add_quick_error_telephonies_bulk: одна транзакция, дубли пропускаются"""
+
+    def test_counts_inserted_and_skips_duplicates(self, database):
+        _add_white_telephonies(database, "aaa", "bbb", "ccc")
+        assert database.add_quick_error_telephony("aaa")
+
+        added = database.add_quick_error_telephonies_bulk(["aaa", "bbb", "ccc", "ccc"])
+
+        assert added == 2
+        codes = {t["code"] for t in database.get_quick_error_telephonies()}
+        assert codes == {"aaa", "bbb", "ccc"}
+
+    def test_single_immediate_transaction(self, database):
+        _add_white_telephonies(database, "aaa", "bbb")
+        statements = _trace_pooled(database)
+
+        assert database.add_quick_error_telephonies_bulk(["aaa", "bbb"]) == 2
+
+        assert statements.count("BEGIN IMMEDIATE") == 1
+        assert statements.count("COMMIT") == 1
+
+    def test_invalidates_code_cache(self, database):
+        _add_white_telephonies(database, "aaa")
+        assert not database.is_quick_error_telephony("aaa")
+
+        database.add_quick_error_telephonies_bulk(["aaa"])
+
+        assert database.is_quick_error_telephony("aaa")
+
+    def test_add_telephony_bumps_version(self, database):
+        version = database.telephonies_version
+
+        _add_white_telephonies(database, "aaa")
+
+        assert database.telephonies_version > version
+
+    def test_add_empty_list(self, database):
+        assert database.add_quick_error_telephonies_bulk([]) == 0
@@ -0,0 +1,901 @@
+"""
+tests/test_google_sheets_service.py
+Unit тесты для сервиса google_sheets_service (без обращения к API)
+Запуск: pytest tests/test_google_sheets_service.py -v
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import datetime
+import pytz
+
+
+def _make_service():
+    """Сервис без авторизации (файла credentials в тестах нет)"""
+    from services.google_sheets_service import GoogleSheetsService
+
+    return GoogleSheetsService()
+
+
+# ===================================================================
+# Тесты кэша статистики недели
+# ===================================================================
+
+class TestWeekStatsCache:
+    """Повторные вызовы в одну минуту не ходят в Apps Script"""
+
+    @pytest.mark.asyncio
+    async def test_second_call_uses_cache(self):
+        service = _make_service()
+        tz = pytz.timezone("Europe/Kiev")
+        start = tz.localize(datetime(2025, 3, 10))
+        end = tz.localize(datetime(2025, 3, 15))
+        data = ({"Дима": {"ПН": 1}}, {"Дима": {"ПН": 0}})
+
+        fetch = AsyncMock(return_value=data)
+        with patch.object(service, "_get_week_stats_by_days", new=fetch):
+            first = await service._get_week_stats_cached(start, end)
+            second = await service._get_week_stats_cached(start, end)
+
+        assert first == second == data
+        assert fetch.await_count == 1
+
+
+# ===================================================================
+# Тесты сбора статистики по дням
+# ===================================================================
+
+class TestWeekStatsByDays:
+    """Подсчёт трубок и перезвонов по дням"""
+
+    @pytest.mark.asyncio
+    async def test_counts_by_day(self):
+        service = _make_service()
+        tz = pytz.timezone("Europe/Kiev")
+        start = tz.localize(datetime(2025, 3, 10))
+        end = tz.localize(datetime(2025, 3, 10))
+        rows = [
+            {"менеджер": "лера", "цвет": "ЗЕЛЕНЫЙ"},
+            {"менеджер": "Лера", "цвет": "ЖЕЛТЫЙ"},
+            {"менеджер": "Незнакомец", "цвет": "ЗЕЛЕНЫЙ"},
+            {"менеджер": "", "цвет": "ЖЕЛТЫЙ"},
+        ]
+
+        fetch = AsyncMock(return_value=rows)
+        with patch.object(service, "_fetch_managers_data_for_date", new=fetch):
+            tubes, recalls = await service._get_week_stats_by_days(start, end)
+        await service.close()
+
+        assert tubes["Лера"] == {"ПН": 2, "ВТ": 0, "СР": 0, "ЧТ": 0, "ПТ": 0, "СБ": 0}
+        assert recalls["Лера"]["ПН"] == 1
+        assert "Незнакомец" not in tubes
+        assert tubes["Дима"]["ПН"] == 0
+
+    @pytest.mark.asyncio
+    async def test_invisible_chars_and_case(self):
+        service = _make_service()
+        tz = pytz.timezone("Europe/Kiev")
+        day = tz.localize(datetime(2025, 3, 10))
+        rows = [
+            {"менеджер": "\u200bЛЕРА\ufeff", "цвет": "ЖЕЛТЫЙ"},
+            {"менеджер": "СЕРГЕЙ ", "цвет": "ЖЕЛТЫЙ"},
+        ]
+
+        fetch = AsyncMock(return_value=rows)
+        with patch.object(service, "_fetch_managers_data_for_date", new=fetch):
+            tubes, _ = await service._get_week_stats_by_days(day, day)
+        await service.close()
+
+        assert tubes["Лера"]["ПН"] == 1
+        assert tubes["Cергей"]["ПН"] == 1
+
+    @pytest.mark.asyncio
+    async def test_days_share_one_session(self):
+        service = _make_service()
+        tz = pytz.timezone("Europe/Kiev")
+        start = tz.localize(datetime(2025, 3, 10))
+        end = tz.localize(datetime(2025, 3, 15))
+
+        fetch = AsyncMock(side_effect=[[], None, [], [], [], []])
+        with patch.object(service, "_fetch_managers_data_for_date", new=fetch):
+            await service._get_week_stats_by_days(start, end)
+        await service.close()
+
+        sessions = {call.args[0] for call in fetch.await_args_list}
+        dates = [call.args[1] for call in fetch.await_args_list]
+        assert len(sessions) == 1
+        assert dates == ["10.03", "11.03", "12.03", "13.03", "14.03", "15.03"]
+
+    @pytest.mark.asyncio
+    async def test_today_flag_passed_to_fetch(self):
+        service = _make_service()
+        tz = pytz.timezone("Europe/Kiev")
+        start = tz.localize(datetime(2025, 3, 10))
+        end = tz.localize(datetime(2025, 3, 15))
+
+        fetch = AsyncMock(return_value=[])
+        with patch("services.google_sheets_service.datetime", _FixedDatetime), \
+                patch.object(service, "_fetch_managers_data_for_date", new=fetch):
+            await service._get_week_stats_by_days(start, end)
+        await service.close()
+
+        flags = [call.kwargs["is_today"] for call in fetch.await_args_list]
+        assert flags == [False, False, True]
+
+    @pytest.mark.asyncio
+    async def test_day_error_is_raised(self):
+        service = _make_service()
+        tz = pytz.timezone("Europe/Kiev")
+        start = tz.localize(datetime(2025, 3, 10))
+        end = tz.localize(datetime(2025, 3, 11))
+
+        fetch = AsyncMock(side_effect=[[], ValueError("HTML")])
+        with patch.object(service, "_fetch_managers_data_for_date", new=fetch):
+            with pytest.raises(ValueError):
+                await service._get_week_stats_by_days(start, end)
+        await service.close()
+
+
+class _FakeResponse:
+    """Ответ aiohttp с заданным телом"""
+
+    def __init__(self, body: bytes, status: int = 200):
+        self.status = status
+        self._body = body
+
+    async def read(self):
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class TestRequestManagersData:
+    """Разбор ответа Apps Script"""
+
+    async def _request(self, body: bytes):
+        service = _make_service()
+        session = MagicMock()
+        session.get.return_value = _FakeResponse(body)
+
+        with patch(
+            "services.google_sheets_service.settings.GOOGLE_APPS_SCRIPT_URL",
+            "https://script.example/exec",
+        ):
+            return await service._request_managers_data(session, "10.03")
+
+    @pytest.mark.asyncio
+    async def test_parses_list(self):
+        data = await self._request('[{"менеджер": "Лера", "цвет": "ЖЕЛТЫЙ"}]'.encode())
+        assert data == [{"менеджер": "Лера", "цвет": "ЖЕЛТЫЙ"}]
+
+    @pytest.mark.asyncio
+    async def test_missing_sheet_is_none(self):
+        assert await self._request('{"error": "Лист 10.03 не найден"}'.encode()) is None
+
+    @pytest.mark.asyncio
+    async def test_html_rejected(self):
+        with pytest.raises(ValueError):
+            await self._request(b"<!DOCTYPE html><html></html>")
+
+
+class TestHttpSession:
+    """Общая HTTP-сессия к Apps Script"""
+
+    @pytest.mark.asyncio
+    async def test_session_reused_until_closed(self):
+        service = _make_service()
+
+        first = await service._get_http()
+        assert await service._get_http() is first
+
+        await service.close()
+        assert first.closed
+        second = await service._get_http()
+        assert second is not first
+        await service.close()
+
+
+class TestDayCache:
+    """Кэш данных Apps Script по дням"""
+
+    @pytest.mark.asyncio
+    async def test_past_day_cached(self):
+        service = _make_service()
+        request = AsyncMock(return_value=[{"менеджер": "Лера", "цвет": "ЖЕЛТЫЙ"}])
+
+        with patch.object(service, "_request_managers_data", new=request):
+            first = await service._fetch_managers_data_for_date(None, "10.03")
+            second = await service._fetch_managers_data_for_date(None, "10.03")
+
+        assert first == second
+        assert request.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_sheet_expires_quickly(self):
+        from services.google_sheets_service import DAY_CACHE_TODAY_SECONDS
+
+        service = _make_service()
+        request = AsyncMock(return_value=None)
+
+        with patch.object(service, "_request_managers_data", new=request):
+            await service._fetch_managers_data_for_date(None, "10.03")
+            cached_at, fetched_as_past, data = service._day_cache["10.03"]
+            service._day_cache["10.03"] = (
+                cached_at - DAY_CACHE_TODAY_SECONDS, fetched_as_past, data
+            )
+            await service._fetch_managers_data_for_date(None, "10.03")
+
+        assert request.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_day_rollover_refetched_once(self):
+        """Дневной снимок не живёт сутки после полуночи"""
+        service = _make_service()
+        evening = [{"менеджер": "Лера", "цвет": "ЖЕЛТЫЙ"}]
+        final = evening + [{"менеджер": "Лера", "цвет": "ЗЕЛЕНЫЙ"}]
+        request = AsyncMock(side_effect=[evening, final])
+
+        with patch.object(service, "_request_managers_data", new=request):
+            # 19:00 понедельника: день ещё идёт
+            await service._fetch_managers_data_for_date(None, "10.03", is_today=True)
+            # 08:00 вторника: прошло 13 часов, понедельник уже прошедший
+            cached_at, fetched_as_past, data = service._day_cache["10.03"]
+            service._day_cache["10.03"] = (cached_at - 13 * 3600, fetched_as_past, data)
+            after_midnight = await service._fetch_managers_data_for_date(
+                None, "10.03", is_today=False
+            )
+            again = await service._fetch_managers_data_for_date(
+                None, "10.03", is_today=False
+            )
+
+        assert after_midnight == again == final
+        assert request.await_count == 2
+
+
+# ===================================================================
+# Тесты _prepare_dashboard_updates
+# ===================================================================
+
+class TestPrepareDashboardUpdates:
+    """Подготовка обновлений без обращений к API"""
+
+    def _prepare(self, tubes_per_day=1, recalls_per_day=0):
+        from config.constants import PAVLOGRAD_MANAGERS
+
+        service = _make_service()
+        days = ("ПН", "ВТ", "СР", "ЧТ", "ПТ", "СБ")
+        tubes = {m: {d: tubes_per_day for d in days} for m in PAVLOGRAD_MANAGERS}
+        recalls = {m: {d: recalls_per_day for d in days} for m in PAVLOGRAD_MANAGERS}
+        all_totals = {m: sum(v.values()) for m, v in tubes.items()}
+        recalls_totals = {m: sum(v.values()) for m, v in recalls.items()}
+        now = pytz.timezone("Europe/Kiev").localize(datetime(2025, 3, 12, 10, 0))
+
+        updates = service._prepare_dashboard_updates(
+            tubes, recalls, all_totals, recalls_totals, now
+        )
+        return {u["range"]: u["values"] for u in updates}
+
+    def test_general_stats_block(self):
+        from config.constants import PAVLOGRAD_MANAGERS
+
+        by_range = self._prepare(tubes_per_day=2, recalls_per_day=1)
+        n = len(PAVLOGRAD_MANAGERS)
+
+        assert by_range["W4:X7"][0][1] == 12 * n
+        assert by_range["W4:X7"][1][1] == 6 * n
+        assert by_range["W4:X7"][2][1] == "50%"
+        assert by_range["W4:X7"][3][1] == f"{n}/{n}"
+
+    def test_manager_rows(self):
+        from config.constants import PAVLOGRAD_MANAGERS
+
+        by_range = self._prepare(tubes_per_day=2, recalls_per_day=1)
+        end = 5 + len(PAVLOGRAD_MANAGERS)
+        first = PAVLOGRAD_MANAGERS[0]
+
+        assert by_range[f"A5:J{end}"][0] == [1, first, 2, 2, 2, 2, 2, 2, 12, "✓"]
+        assert by_range[f"L5:U{end}"][0] == [1, first, 1, 1, 1, 1, 1, 1, 6, "50%"]
+
+    def test_total_rows_written_with_tables(self):
+        from config.constants import PAVLOGRAD_MANAGERS
+
+        by_range = self._prepare()
+        last = 4 + len(PAVLOGRAD_MANAGERS)
+        total_row = last + 1
+
+        tubes_total = by_range[f"A5:J{total_row}"][-1]
+        recalls_total = by_range[f"L5:U{total_row}"][-1]
+
+        assert tubes_total[1] == "ИТОГО:"
+        assert tubes_total[2] == f"=SUM(C5:C{last})"
+        assert tubes_total[0] is None and tubes_total[9] is None
+        assert recalls_total[8] == f"=SUM(T5:T{last})"
+
+    def test_update_time(self):
+        by_range = self._prepare()
+        assert by_range["L1"] == [["🔄 Обновлено: 12.03.2025 10:00"]]
+
+
+# ===================================================================
+# Тесты строки ИТОГО
+# ===================================================================
+
+class TestTotalRowRequest:
+    """Формат строки ИТОГО (значения пишутся вместе с таблицами)"""
+
+    def test_format_only(self):
+        from services.google_sheets_service import GoogleSheetsService
+
+        req = GoogleSheetsService._total_row_request(7, 29)
+        update = req["updateCells"]
+        cells = update["rows"][0]["values"]
+
+        assert update["range"]["startRowIndex"] == 28
+        assert update["range"]["startColumnIndex"] == 0
+        assert update["range"]["endColumnIndex"] == 21
+        assert len(cells) == 21
+        assert cells[10] == {}
+        formatted = cells[:10] + cells[11:]
+        assert all("userEnteredValue" not in c for c in formatted)
+        assert all(c["userEnteredFormat"]["textFormat"]["bold"] for c in formatted)
+        assert update["fields"] == "userEnteredFormat(backgroundColor,textFormat)"
+
+
+# ===================================================================
+# Тесты учёта квоты записей
+# ===================================================================
+
+class TestWriteQuota:
+    """Упреждающее ожидание перед превышением минутного лимита"""
+
+    @pytest.mark.asyncio
+    async def test_counts_write_quota_used(self):
+        service = _make_service()
+        await service._reserve_write_quota()
+        await service._reserve_write_quota(2)
+        assert service.write_quota_used == 3
+
+    @pytest.mark.asyncio
+    async def test_sleeps_when_quota_exhausted(self):
+        from services.google_sheets_service import WRITE_QUOTA_PER_MINUTE
+
+        service = _make_service()
+        sleep = AsyncMock()
+
+        with patch("services.google_sheets_service.time.monotonic", return_value=90.0), \
+                patch("services.google_sheets_service.asyncio.sleep", new=sleep):
+            await service._reserve_write_quota(WRITE_QUOTA_PER_MINUTE)
+            await service._reserve_write_quota()
+
+        sleep.assert_awaited_once()
+        assert service._writes_this_minute == 1
+
+
+# ===================================================================
+# Тесты кэша листов
+# ===================================================================
+
+class TestWorksheetCache:
+    """Известные листы не требуют запроса метаданных"""
+
+    def test_cached_worksheet_skips_lookup(self):
+        service = _make_service()
+        service.spreadsheet = MagicMock()
+        service._ws_cache = {"Неделя": {"sheetId": 42, "title": "Неделя", "index": 0}}
+
+        worksheet = service._get_worksheet("Неделя")
+
+        assert worksheet.id == 42
+        service.spreadsheet.worksheet.assert_not_called()
+
+    def test_miss_is_remembered(self):
+        service = _make_service()
+        service.spreadsheet = MagicMock()
+        found = MagicMock(id=7, title="Неделя", index=1)
+        other = MagicMock(id=8, title="Прошлая", index=0)
+        service.spreadsheet.worksheets.return_value = [other, found]
+
+        with patch("services.google_sheets_service.sheets_cache") as cache:
+            assert service._get_worksheet("Неделя").id == 7
+            assert service._get_worksheet("Прошлая").id == 8
+            cache.save_to_cache.assert_called_once()
+
+        service.spreadsheet.worksheets.assert_called_once()
+        assert service._ws_cache["Неделя"]["sheetId"] == 7
+
+    def test_handle_reused_until_forgotten(self):
+        from gspread.exceptions import WorksheetNotFound
+
+        service = _make_service()
+        service.spreadsheet = MagicMock()
+        service.spreadsheet.worksheets.return_value = []
+        service._ws_cache = {"Неделя": {"sheetId": 42, "title": "Неделя", "index": 0}}
+
+        first = service._get_worksheet("Неделя")
+        assert service._get_worksheet("Неделя") is first
+
+        with patch("services.google_sheets_service.sheets_cache"):
+            service._forget_worksheet("Неделя")
+            with pytest.raises(WorksheetNotFound):
+                service._get_worksheet("Неделя")
+
+    @pytest.mark.asyncio
+    async def test_current_week_handle_skips_thread(self):
+        service = _make_service()
+        service._cached_ws = MagicMock(title="Неделя")
+
+        with patch("services.google_sheets_service.asyncio.to_thread") as to_thread:
+            worksheet = await service._get_or_create_worksheet("Неделя", None)
+
+        assert worksheet is service._cached_ws
+        to_thread.assert_not_called()
+
+
+# ===================================================================
+# Тесты создания листа недели
+# ===================================================================
+
+class TestCreateWeeklySheet:
+    """Лист, ширина колонок и шапка создаются одним batchUpdate"""
+
+    @pytest.mark.asyncio
+    async def test_add_sheet_and_widths_in_one_batch(self):
+        service = _make_service()
+        service.client = MagicMock()
+        service.spreadsheet = MagicMock()
+        service.spreadsheet.worksheets.return_value = []
+        service.spreadsheet.batch_update.return_value = {
+            "replies": [
+                {"addSheet": {"properties": {"sheetId": 20250310, "title": "x", "index": 3}}}
+            ]
+        }
+        now = pytz.timezone("Europe/Kiev").localize(datetime(2025, 3, 12, 10, 0))
+
+        with patch("services.google_sheets_service.sheets_cache"):
+            worksheet = await service._create_weekly_sheet(now)
+
+        body = service.spreadsheet.batch_update.call_args[0][0]
+        requests = body["requests"]
+
+        assert worksheet.id == 20250310
+        assert requests[0]["addSheet"]["properties"]["sheetId"] == 20250310
+        widths = [r for r in requests if "updateDimensionProperties" in r]
+        assert len(widths) == 13
+        assert all(
+            r["updateDimensionProperties"]["range"]["sheetId"] == 20250310
+            for r in widths
+        )
+        assert any("mergeCells" in r for r in requests)
+        service.spreadsheet.batch_update.assert_called_once()
+        service.spreadsheet.add_worksheet.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_taken_sheet_id_falls_back_to_reply_id(self):
+        service = _make_service()
+        service.client = MagicMock()
+        service.spreadsheet = MagicMock()
+        service.spreadsheet.worksheets.return_value = []
+        service.spreadsheet.batch_update.side_effect = [
+            _api_error(400, message="Sheet with id 20250310 already exists"),
+            {"replies": [{"addSheet": {"properties": {"sheetId": 777, "title": "x", "index": 3}}}]},
+            {},
+        ]
+        now = pytz.timezone("Europe/Kiev").localize(datetime(2025, 3, 12, 10, 0))
+
+        with patch("services.google_sheets_service.sheets_cache"):
+            worksheet = await service._create_weekly_sheet(now)
+
+        calls = [c[0][0]["requests"] for c in service.spreadsheet.batch_update.call_args_list]
+        assert worksheet.id == 777
+        assert len(calls) == 3
+        assert "sheetId" not in calls[1][0]["addSheet"]["properties"]
+        widths = [r for r in calls[2] if "updateDimensionProperties" in r]
+        assert widths and all(
+            r["updateDimensionProperties"]["range"]["sheetId"] == 777 for r in widths
+        )
+
+    def test_column_widths_merged_into_spans(self):
+        from services.google_sheets_service import COLUMN_WIDTHS, GoogleSheetsService
+
+        spans = [
+            r["updateDimensionProperties"]
+            for r in GoogleSheetsService._column_width_requests(1)
+        ]
+        widths = []
+        for span in spans:
+            size = span["range"]["endIndex"] - span["range"]["startIndex"]
+            widths.extend([span["properties"]["pixelSize"]] * size)
+
+        assert tuple(widths) == COLUMN_WIDTHS
+        assert len(spans) == 13
+
+
+# ===================================================================
+# Тесты счётчика запросов
+# ===================================================================
+
+class TestRequestCounter:
+    """Классификация и подсчёт запросов к API"""
+
+    def test_op_type(self):
+        from services.google_sheets_service import _request_op_type
+
+        base = "https://sheets.googleapis.com/v4/spreadsheets/abc"
+        assert _request_op_type("post", f"{base}/values:batchUpdate") == "values:batchUpdate"
+        assert _request_op_type("get", f"{base}/values:batchGet") == "values:batchGet"
+        assert _request_op_type("post", f"{base}:batchUpdate") == ":batchUpdate"
+        assert _request_op_type("get", f"{base}/values/A1") == "values:get"
+        assert _request_op_type("get", base) == "metadata:get"
+
+    def test_counts_requests(self):
+        import gspread
+        from google.oauth2.credentials import Credentials
+        from services.google_sheets_service import CountingClient
+
+        client = CountingClient(auth=Credentials(token="test"))
+        with patch.object(gspread.Client, "request") as request:
+            client.request("post", "https://x/spreadsheets/abc:batchUpdate")
+            client.request("post", "https://x/spreadsheets/abc:batchUpdate")
+
+        assert request.call_count == 2
+        assert client.request_counter[":batchUpdate"] == 2
+
+    def test_api_requests_sums_reads_and_writes(self):
+        from collections import Counter
+
+        service = _make_service()
+        assert service.api_requests == 0
+
+        service.client = MagicMock(
+            request_counter=Counter({":batchUpdate": 2, "metadata:get": 3})
+        )
+        assert service.api_requests == 5
+
+    def test_authorize_reuses_pooled_session(self):
+        from google.oauth2.credentials import Credentials
+        from services.google_sheets_service import CountingClient, HTTP_POOL_MAXSIZE
+
+        service = _make_service()
+        creds = Credentials(token="test")
+
+        with patch("services.google_sheets_service.os.path.exists", return_value=True), \
+                patch("services.google_sheets_service.Credentials.from_service_account_file", return_value=creds), \
+                patch.object(CountingClient, "open_by_key"), \
+                patch("services.google_sheets_service.sheets_cache"):
+            assert service._authorize()
+            first = service._session
+            assert service.client.session is first
+            assert first.get_adapter("https://sheets.googleapis.com")._pool_maxsize == HTTP_POOL_MAXSIZE
+
+            with patch.object(first, "close") as close:
+                assert service.refresh_auth()
+            close.assert_called_once()
+            assert service._session is not first
+
+
+class TestLayoutRequests:
+    """Объединения, тексты и оформление шапки"""
+
+    def test_layout_requests(self):
+        service = _make_service()
+        tz = pytz.timezone("Europe/Kiev")
+
+        requests = service._layout_requests(
+            20250310, tz.localize(datetime(2025, 3, 10)), tz.localize(datetime(2025, 3, 15))
+        )
+        merges = [r["mergeCells"] for r in requests if "mergeCells" in r]
+        cells = [r["updateCells"] for r in requests if "updateCells" in r]
+        formats = [r["repeatCell"] for r in requests if "repeatCell" in r]
+
+        assert len(merges) == 5
+        assert len(formats) == 8
+        assert all(m["range"]["sheetId"] == 20250310 for m in merges)
+        title = cells[0]["rows"][0]["values"][0]["userEnteredValue"]["stringValue"]
+        assert title == "📊 СТАТИСТИКА НЕДЕЛИ 10-15 МАРТА 2025"
+
+    def test_header_format_fields_match_keys(self):
+        from services.google_sheets_service import GoogleSheetsService
+
+        requests = GoogleSheetsService._header_format_requests(1)
+        title = requests[0]["repeatCell"]
+
+        assert title["range"] == {
+            "sheetId": 1, "startRowIndex": 0, "endRowIndex": 1,
+            "startColumnIndex": 0, "endColumnIndex": 10,
+        }
+        assert title["fields"] == (
+            "userEnteredFormat(backgroundColor,textFormat,"
+            "horizontalAlignment,verticalAlignment)"
+        )
+
+
+# ===================================================================
+# Тесты update_stats: значения и оформление одним запросом
+# ===================================================================
+
+class _FixedDatetime(datetime):
+    """Среда 12.03.2025 10:00 вместо текущего времени"""
+
+    @classmethod
+    def now(cls, tz=None):
+        return tz.localize(datetime(2025, 3, 12, 10, 0))
+
+
+class TestUpdateStatsBatch:
+    """Значения и оформление уходят одним batchUpdate, оформление — только при изменениях"""
+
+    async def _run(self, service, tubes):
+        from config.constants import PAVLOGRAD_MANAGERS
+
+        days = ("ПН", "ВТ", "СР", "ЧТ", "ПТ", "СБ")
+        by_days = {m: dict.fromkeys(days, 0) for m in PAVLOGRAD_MANAGERS}
+        by_days["Лера"]["ПН"] = tubes
+        recalls = {m: dict.fromkeys(days, 0) for m in PAVLOGRAD_MANAGERS}
+
+        with patch("services.google_sheets_service.datetime", _FixedDatetime), \
+                patch.object(service, "_get_worksheet", return_value=MagicMock(id=1)), \
+                patch.object(service, "_get_week_stats_cached", new=AsyncMock(return_value=(by_days, recalls))):
+            await service.update_stats()
+
+        return service.spreadsheet.batch_update.call_args[0][0]["requests"]
+
+    @pytest.mark.asyncio
+    async def test_formatting_only_when_totals_change(self):
+        service = _make_service()
+        service.client = MagicMock()
+        service.spreadsheet = MagicMock()
+
+        first = await self._run(service, 3)
+        second = await self._run(service, 3)
+        third = await self._run(service, 4)
+
+        assert service.spreadsheet.batch_update.call_count == 3
+        assert any("updateBorders" in r for r in first)
+        assert all("updateCells" in r for r in second)
+        assert any("updateBorders" in r for r in third)
+
+
+    @pytest.mark.asyncio
+    async def test_reauthorizes_when_not_initialized(self):
+        service = _make_service()
+
+        with patch("services.google_sheets_service.datetime", _FixedDatetime), \
+                patch.object(service, "refresh_auth", return_value=False) as refresh:
+            with pytest.raises(Exception, match="не инициализирован"):
+                await service.update_stats()
+
+        refresh.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_worksheet_and_stats_fetched_concurrently(self):
+        from config.constants import PAVLOGRAD_MANAGERS
+
+        service = _make_service()
+        service.client = MagicMock()
+        service.spreadsheet = MagicMock()
+        both_started = asyncio.Event()
+        started = []
+
+        async def fake_worksheet(title, now):
+            started.append("ws")
+            if len(started) == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), 1)
+            return MagicMock(id=1)
+
+        async def fake_stats(start, end):
+            started.append("stats")
+            if len(started) == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), 1)
+            days = dict.fromkeys(("ПН", "ВТ", "СР", "ЧТ", "ПТ", "СБ"), 0)
+            empty = {m: dict(days) for m in PAVLOGRAD_MANAGERS}
+            return empty, empty
+
+        with patch("services.google_sheets_service.datetime", _FixedDatetime), \
+                patch.object(service, "_get_or_create_worksheet", new=fake_worksheet), \
+                patch.object(service, "_get_week_stats_cached", new=fake_stats):
+            await service.update_stats()
+
+        assert sorted(started) == ["stats", "ws"]
+        service.spreadsheet.batch_update.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_stale_sheet_id_resolved_and_retried_once(self):
+        from config.constants import PAVLOGRAD_MANAGERS
+
+        service = _make_service()
+        service.client = MagicMock()
+        service.spreadsheet = MagicMock()
+        service.spreadsheet.batch_update.side_effect = [
+            _api_error(400, message="Invalid requests[0].updateCells: No grid with id: 1"),
+            {},
+        ]
+        stale, fresh = MagicMock(id=1), MagicMock(id=2)
+        stale.title = fresh.title = "week"
+        days = dict.fromkeys(("ПН", "ВТ", "СР", "ЧТ", "ПТ", "СБ"), 0)
+        empty = {m: dict(days) for m in PAVLOGRAD_MANAGERS}
+
+        with patch("services.google_sheets_service.datetime", _FixedDatetime), \
+                patch.object(service, "_get_or_create_worksheet", new=AsyncMock(side_effect=[stale, fresh])), \
+                patch.object(service, "_get_week_stats_cached", new=AsyncMock(return_value=(empty, empty))):
+            await service.update_stats()
+
+        assert service.spreadsheet.batch_update.call_count == 2
+        retried = service.spreadsheet.batch_update.call_args[0][0]["requests"]
+        assert retried[0]["updateCells"]["start"]["sheetId"] == 2
+        assert any("updateBorders" in r for r in retried)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status, message", [
+        (429, "Quota exceeded"),
+        (503, "The service is currently unavailable."),
+        (400, "Invalid value at 'data.values'"),
+    ])
+    async def test_other_errors_keep_cached_sheet(self, status, message):
+        from gspread.exceptions import APIError
+
+        service = _make_service()
+        service.client = MagicMock()
+        service.spreadsheet = MagicMock()
+        service.spreadsheet.batch_update.side_effect = _api_error(status, message=message)
+        worksheet = MagicMock(id=1)
+        worksheet.title = "week"
+        build_requests = MagicMock(return_value=([{}], "sig"))
+
+        with patch.object(service, "_forget_worksheet") as forget, \
+                patch.object(service, "_get_or_create_worksheet", new=AsyncMock()) as resolve:
+            with pytest.raises(APIError):
+                await service._commit_updates(worksheet, build_requests, datetime(2025, 3, 12))
+
+        forget.assert_not_called()
+        resolve.assert_not_awaited()
+        assert service.spreadsheet.batch_update.call_count == 1
+
+
+class TestFormattingRequests:
+    """Границы, градиенты и формат ИТОГО"""
+
+    def test_gradients_as_two_strips(self):
+        from config.constants import PAVLOGRAD_MANAGERS
+
+        service = _make_service()
+        totals = dict.fromkeys(PAVLOGRAD_MANAGERS, 0)
+        totals["Лера"] = 5
+        recalls = dict.fromkeys(PAVLOGRAD_MANAGERS, 0)
+
+        requests = service._prepare_formatting_requests(1, totals, recalls)
+        strips = [
+            r["updateCells"] for r in requests
+            if "updateCells" in r and "start" in r["updateCells"]
+        ]
+
+        assert [s["start"]["columnIndex"] for s in strips] == [8, 19]
+        assert all(len(s["rows"]) == len(PAVLOGRAD_MANAGERS) for s in strips)
+        lera = PAVLOGRAD_MANAGERS.index("Лера")
+        assert strips[0]["rows"][lera]["values"][0]["userEnteredFormat"]["textFormat"]["bold"]
+        assert strips[0]["rows"][0]["values"] == [{}]
+        assert not any("repeatCell" in r for r in requests)
+
+    def test_gradient_cells_memoized(self):
+        from services.google_sheets_service import (
+            GRADIENT_HIGH, GRADIENT_LOW, GoogleSheetsService,
+        )
+
+        first = GoogleSheetsService._gradient_cell(9, 1, 10)
+        assert GoogleSheetsService._gradient_cell(9, 1, 10) is first
+        assert first["userEnteredFormat"]["backgroundColor"] is GRADIENT_HIGH
+        low = GoogleSheetsService._gradient_cell(1, 1, 10)
+        assert low["userEnteredFormat"]["backgroundColor"] is GRADIENT_LOW
+
+    def test_borders(self):
+        from config.constants import PAVLOGRAD_MANAGERS
+        from services.google_sheets_service import INNER_BORDER, OUTER_BORDER
+
+        service = _make_service()
+        totals = dict.fromkeys(PAVLOGRAD_MANAGERS, 0)
+
+        requests = service._prepare_formatting_requests(1, totals, totals)
+        borders = [r["updateBorders"] for r in requests if "updateBorders" in r]
+
+        assert [(b["range"]["startColumnIndex"], b["range"]["endColumnIndex"]) for b in borders] == [
+            (0, 10), (11, 21), (22, 24)
+        ]
+        assert borders[0]["range"]["endRowIndex"] == 5 + len(PAVLOGRAD_MANAGERS)
+        assert borders[2]["top"] is OUTER_BORDER
+        assert borders[2]["innerVertical"] is INNER_BORDER
+
+
+class TestValuesRequests:
+    """Перевод A1-обновлений в updateCells"""
+
+    def test_cell_types(self):
+        from services.google_sheets_service import GoogleSheetsService
+
+        req = GoogleSheetsService._values_requests(
+            1, [{"range": "W4:X5", "values": [["Всего", 12], [None, "=A1"]]}]
+        )[0]["updateCells"]
+
+        assert req["start"] == {"sheetId": 1, "rowIndex": 3, "columnIndex": 22}
+        assert req["fields"] == "userEnteredValue"
+        first, second = (row["values"] for row in req["rows"])
+        assert first[0]["userEnteredValue"] == {"stringValue": "Всего"}
+        assert first[1]["userEnteredValue"] == {"numberValue": 12}
+        assert second[0] == {}
+        assert second[1]["userEnteredValue"] == {"formulaValue": "=A1"}
+
+
+# ===================================================================
+# Тесты диапазона и названия недели
+# ===================================================================
+
+class TestWeekRange:
+    """Понедельник-суббота; воскресенье относится к следующей неделе"""
+
+    def test_midweek(self):
+        service = _make_service()
+        now = pytz.timezone("Europe/Kiev").localize(datetime(2025, 3, 12, 10, 30))
+
+        start, end = service._get_week_range(now)
+
+        assert start == now.replace(day=10)
+        assert end == now.replace(day=15)
+        assert service._get_week_title(start, end) == "Неделя 10-15 Марта 2025"
+
+    def test_sunday_is_next_week(self):
+        service = _make_service()
+        sunday = pytz.timezone("Europe/Kiev").localize(datetime(2025, 3, 16, 9, 0))
+
+        start, end = service._get_week_range(sunday)
+
+        assert start.date() == datetime(2025, 3, 17).date()
+        assert end.date() == datetime(2025, 3, 22).date()
+
+
+# ===================================================================
+# Тесты политики повторов
+# ===================================================================
+
+def _api_error(status, headers=None, message=""):
+    from gspread.exceptions import APIError
+
+    response = MagicMock(status_code=status, headers=headers or {})
+    response.json.return_value = {"error": {"code": status, "message": message}}
+    return APIError(response)
+
+
+class TestRetryPolicy:
+    """Повторяем только 429/5xx и учитываем Retry-After"""
+
+    @pytest.mark.parametrize("status, expected", [
+        (429, True), (500, True), (503, True), (400, False), (403, False), (404, False),
+    ])
+    def test_api_error_statuses(self, status, expected):
+        from services.google_sheets_service import _is_retryable
+
+        assert _is_retryable(_api_error(status)) is expected
+
+    def test_network_errors_retryable(self):
+        import aiohttp
+        from services.google_sheets_service import _is_retryable
+
+        assert _is_retryable(aiohttp.ClientError())
+        assert _is_retryable(TimeoutError())
+        assert not _is_retryable(ValueError())
+
+    def test_wait_honours_retry_after(self):
+        from services.google_sheets_service import _wait_retry_after
+
+        state = MagicMock(attempt_number=1)
+        state.outcome.exception.return_value = _api_error(429, {"Retry-After": "30"})
+        assert _wait_retry_after(state) >= 30
+
+        state.outcome.exception.return_value = _api_error(429, {"Retry-After": "600"})
+        assert _wait_retry_after(state) == 60
+
+        state.outcome.exception.return_value = _api_error(503)
+        assert _wait_retry_after(state) < 30
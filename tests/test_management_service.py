@@ -0,0 +1,90 @@
+"""
+tests/test_management_service.py
+Unit тесты для сервиса management_service (без обращения к Telegram)
+Запуск: pytest tests/test_management_service.py -v
+"""
+import sqlite3
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Чистая БД, подставленная в сервис, и пустые кэши списков"""
+    from database.models import Database
+    from services.management_service import ManagementService
+
+    database = Database(str(tmp_path / "test.db"))
+    with patch("services.management_service.db", database), \
+            patch.object(ManagementService, "_managers_list_cache", None), \
+            patch.object(ManagementService, "_telephonies_list_cache", None):
+        yield database
+
+
+# ===================================================================
+# Тесты кэша отрисованных списков
+# ===================================================================
+
+class TestListCache:
+    """Кэш списков сбрасывается и при записях из других процессов"""
+
+    def test_telephonies_list_sees_external_write(self, database):
+        from services.management_service import ManagementService
+
+        assert database.add_telephony("BMW", "bmw", "white", group_id=-100)
+        assert "BMW" in ManagementService.get_telephonies_list()
+
+        # Запись в обход Database (как у скриптов в scripts/)
+        with sqlite3.connect(database.db_path) as conn:
+            conn.execute(
+                "INSERT INTO telephonies (name, code, type, group_id) VALUES (?, ?, ?, ?)",
+                ("Zvon", "zvon", "black", -200),
+            )
+
+        assert "Zvon" in ManagementService.get_telephonies_list()
+
+    def test_telephonies_list_cached_without_changes(self, database):
+        from services.management_service import ManagementService
+
+        assert database.add_telephony("BMW", "bmw", "white", group_id=-100)
+        first = ManagementService.get_telephonies_list()
+
+        with patch.object(database, "get_telephony_rows") as rows:
+            assert ManagementService.get_telephonies_list() == first
+
+        rows.assert_not_called()
+
+
+# ===================================================================
+# Тесты рассылки
+# ===================================================================
+
+class TestBroadcastCopy:
+    """Сбой одного получателя не обрывает рассылку"""
+
+    @pytest.mark.asyncio
+    async def test_unexpected_error_counted_as_failed(self):
+        from telegram import error as telegram_error
+        from services.management_service import ManagementService
+
+        failures = {2: OSError("connection reset"), 3: telegram_error.Forbidden("blocked")}
+
+        async def copy_message(chat_id, **kwargs):
+            if chat_id in failures:
+                raise failures[chat_id]
+
+        bot = MagicMock()
+        bot.copy_message = AsyncMock(side_effect=copy_message)
+        managers = [{"user_id": user_id} for user_id in (1, 2, 3)]
+
+        with patch("services.management_service.db") as db:
+            db.get_all_managers.return_value = managers
+            stats = await ManagementService.broadcast_copy(bot, 100, 5, sent_by=1)
+
+        assert stats == {
+            "total": 3,
+            "success": 1,
+            "failed": 1,
+            "blocked": 1,
+            "failed_ids": [2, 3],
+        }
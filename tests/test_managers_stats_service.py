@@ -0,0 +1,183 @@
+"""
+tests/test_managers_stats_service.py
+Unit тесты для сервиса managers_stats_service (без обращения к Apps Script)
+Запуск: pytest tests/test_managers_stats_service.py -v
+"""
+import asyncio
+import aiohttp
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from tenacity import wait_none
+
+APPS_SCRIPT_URL = "https://script.example.com/exec"
+
+ROWS = [
+    {"менеджер": "Лера", "цвет": "ЗЕЛЕНЫЙ"},
+    {"менеджер": "Дима", "цвет": "ЖЕЛТЫЙ"},
+]
+
+
+def _make_service():
+    from services.managers_stats_service import ManagersStatsService
+
+    return ManagersStatsService()
+
+
+def _slow_fetch(rows):
+    """Запрос в Apps Script, который отвечает не сразу"""
+
+    async def fetch(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        return rows
+
+    return AsyncMock(side_effect=fetch)
+
+
+def _session_responding(status: int):
+    """aiohttp-сессия, у которой каждый GET возвращает статус status"""
+    response = MagicMock(status=status)
+    if status >= 500:
+        response.raise_for_status.side_effect = aiohttp.ClientResponseError(
+            MagicMock(), (), status=status
+        )
+
+    request = MagicMock()
+    request.__aenter__ = AsyncMock(return_value=response)
+    request.__aexit__ = AsyncMock(return_value=False)
+
+    session = MagicMock()
+    session.get.return_value = request
+    return session
+
+
+# ===================================================================
+# Тесты кэша дашборда
+# ===================================================================
+
+class TestStatsCache:
+    """Готовый дашборд живёт STATS_CACHE_SECONDS"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_fetch(self):
+        service = _make_service()
+        fetch = _slow_fetch(ROWS)
+
+        with patch.object(service, "_fetch_managers_data", new=fetch):
+            first, second = await asyncio.gather(
+                service.get_managers_stats(), service.get_managers_stats()
+            )
+
+        assert first == second
+        assert fetch.await_count == 1
+        assert service._stats_inflight is None
+
+    @pytest.mark.asyncio
+    async def test_fresh_cache_not_refetched(self):
+        service = _make_service()
+        fetch = AsyncMock(return_value=ROWS)
+
+        with patch.object(service, "_fetch_managers_data", new=fetch):
+            first = await service.get_managers_stats()
+            second = await service.get_managers_stats()
+
+        assert first == second
+        assert fetch.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_cache_refetched(self):
+        from services.managers_stats_service import STATS_CACHE_SECONDS
+
+        service = _make_service()
+        fetch = AsyncMock(return_value=ROWS)
+
+        with patch.object(service, "_fetch_managers_data", new=fetch):
+            await service.get_managers_stats()
+            # Состариваем кэш на STATS_CACHE_SECONDS
+            ts, text = service._stats_cache
+            service._stats_cache = (ts - STATS_CACHE_SECONDS - 1, text)
+            await service.get_managers_stats()
+
+        assert fetch.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_error_not_cached(self):
+        service = _make_service()
+        fetch = AsyncMock(side_effect=[ValueError("boom"), ROWS])
+
+        with patch.object(service, "_fetch_managers_data", new=fetch):
+            failed = await service.get_managers_stats()
+            recovered = await service.get_managers_stats()
+
+        assert failed.startswith("⚠️")
+        assert recovered != failed
+        assert fetch.await_count == 2
+
+
+# ===================================================================
+# Тесты группировки по менеджерам
+# ===================================================================
+
+class TestGroupByManager:
+    """Учитываются только трубки известных цветов"""
+
+    def test_unknown_colour_manager_not_counted(self):
+        service = _make_service()
+        data = ROWS + [
+            {"менеджер": "Саша", "цвет": "СИНИЙ"},
+            {"менеджер": "Лера", "цвет": "СИНИЙ"},
+            {"менеджер": " ", "цвет": "ЗЕЛЕНЫЙ"},
+        ]
+
+        stats = service._group_by_manager(data)
+
+        assert stats == {
+            "Лера": {"ЖЕЛТЫЙ": 0, "ЗЕЛЕНЫЙ": 1, "ФИОЛЕТОВЫЙ": 0},
+            "Дима": {"ЖЕЛТЫЙ": 1, "ЗЕЛЕНЫЙ": 0, "ФИОЛЕТОВЫЙ": 0},
+        }
+        dashboard = service._group_and_format(data)
+        assert "• Менеджеров: 2\n" in dashboard
+        assert "Саша" not in dashboard
+
+    def test_only_unknown_colours_is_empty(self):
+        service = _make_service()
+
+        dashboard = service._group_and_format([{"менеджер": "Саша", "цвет": "СИНИЙ"}])
+
+        assert "Данных нет" in dashboard
+
+
+# ===================================================================
+# Тесты повторов GET к Apps Script
+# ===================================================================
+
+class TestGetWithRetry:
+    """Повторяются только временные сбои"""
+
+    @pytest.fixture(autouse=True)
+    def no_wait(self):
+        from services.managers_stats_service import ManagersStatsService
+
+        with patch.object(ManagersStatsService._get_with_retry.retry, "wait", wait_none()):
+            yield
+
+    @pytest.mark.asyncio
+    async def test_client_error_not_retried(self):
+        service = _make_service()
+        session = _session_responding(404)
+
+        with patch.object(service, "_get_session", new=AsyncMock(return_value=session)):
+            with pytest.raises(Exception, match="HTTP 404"):
+                await service._get_with_retry(APPS_SCRIPT_URL)
+
+        assert session.get.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_server_error_retried(self):
+        service = _make_service()
+        session = _session_responding(503)
+
+        with patch.object(service, "_get_session", new=AsyncMock(return_value=session)):
+            with pytest.raises(aiohttp.ClientResponseError):
+                await service._get_with_retry(APPS_SCRIPT_URL)
+
+        assert session.get.call_count == 3
@@ -0,0 +1,68 @@
+"""
+tests/test_quick_error_service.py
+Unit тесты для сервиса quick_error_service (временный файл SQLite)
+Запуск: pytest tests/test_quick_error_service.py -v
+"""
+import pytest
+from unittest.mock import patch
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Чистая БД с белой телефонией bmw, подставленная в сервис"""
+    from database.models import Database
+
+    database = Database(str(tmp_path / "test.db"))
+    assert database.add_telephony("BMW", "bmw", "white", group_id=-100)
+    with patch("services.quick_error_service.db", database):
+        yield database
+
+
+# ===================================================================
+# Тесты сброса кэша кодов быстрых ошибок
+# ===================================================================
+
+class TestQuickErrorCacheInvalidation:
+    """Изменения через сервис видны сразу, без ожидания QUICK_ERROR_CACHE_SECONDS"""
+
+    def test_add_invalidates_cache(self, database):
+        from services.quick_error_service import QuickErrorService
+
+        assert not database.is_quick_error_telephony("bmw")  # кэш заполнен
+
+        success, _ = QuickErrorService.add_quick_error_telephony("bmw")
+
+        assert success
+        assert database.is_quick_error_telephony("bmw")
+
+    def test_remove_invalidates_cache(self, database):
+        from services.quick_error_service import QuickErrorService
+
+        assert QuickErrorService.add_quick_error_telephony("bmw")[0]
+        assert database.is_quick_error_telephony("bmw")  # кэш заполнен
+
+        success, _ = QuickErrorService.remove_quick_error_telephony("bmw")
+
+        assert success
+        assert not database.is_quick_error_telephony("bmw")
+
+    def test_bulk_add_invalidates_cache(self, database):
+        from services.quick_error_service import QuickErrorService
+
+        assert not database.is_quick_error_telephony("bmw")  # кэш заполнен
+
+        added, errors = QuickErrorService.bulk_add_quick_error_telephonies(["bmw"])
+
+        assert (added, errors) == (1, [])
+        assert database.is_quick_error_telephony("bmw")
+
+    def test_cache_served_until_invalidated(self, database):
+        assert not database.is_quick_error_telephony("bmw")  # кэш заполнен
+
+        # Запись в обход сервиса кэш не сбрасывает
+        with database.connection() as conn:
+            conn.execute("INSERT INTO quick_error_telephonies (telephony_code) VALUES ('bmw')")
+
+        assert not database.is_quick_error_telephony("bmw")
+        database.invalidate_quick_error_cache()
+        assert database.is_quick_error_telephony("bmw")
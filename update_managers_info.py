@@ -34,14 +34,8 @@ async def update_managers_info():
             first_name = chat.first_name
 
             # Обновляем в БД
-            conn = db._get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                "UPDATE managers SET username = ?, first_name = ? WHERE user_id = ?",
-                (username, first_name, user_id),
-            )
-            conn.commit()
-            conn.close()
+            if not db.update_manager_info(user_id, username, first_name):
+                raise RuntimeError("запись в БД не обновлена")
 
             updated += 1
             logger.info(f"✅ Обновлён {user_id}: @{username} ({first_name})")
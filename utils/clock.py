@@ -0,0 +1,25 @@
+"""
+utils/clock.py - Время для шапок дашбордов
+
+Шапка показывает только часы и минуты, поэтому строка форматируется
+не чаще раза в CLOCK_CACHE_SECONDS: время в ней отстаёт от реального
+не больше чем на полминуты.
+"""
+import time
+from datetime import datetime, timezone, timedelta
+
+KIEV_TZ = timezone(timedelta(hours=2))
+
+CLOCK_CACHE_SECONDS = 30
+_clock_ts = float("-inf")
+_clock_str = ""
+
+
+def now_kiev_hhmm() -> str:
+    """Текущее время по Киеву в формате ЧЧ:ММ (с кэшем)"""
+    global _clock_ts, _clock_str
+    now = time.monotonic()
+    if now - _clock_ts > CLOCK_CACHE_SECONDS:
+        _clock_str = datetime.now(KIEV_TZ).strftime("%H:%M")
+        _clock_ts = now
+    return _clock_str